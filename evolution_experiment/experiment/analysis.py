@@ -0,0 +1,105 @@
+"""
+Statistical analysis of the raw results.
+
+Each seed contributes one outcome per phase: its mean food per creature
+averaged over the phase's generations. Conditions are compared with Welch's
+t-tests, Cohen's d and 95% confidence intervals.
+"""
+
+import os
+import itertools
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from experiment.raw_data import CONDITIONS, PHASES, MEAN_FOOD, raw_path
+
+CI_LEVEL = 0.95
+
+
+def load_raw(results_dir):
+    """Concatenate the <condition>_raw.csv files with a `condition` column."""
+    frames = []
+    for cond in CONDITIONS:
+        path = raw_path(results_dir, cond)
+        if os.path.exists(path):
+            df = pd.read_csv(path)
+            df.insert(0, "condition", cond)
+            frames.append(df)
+    if not frames:
+        raise FileNotFoundError(f"No raw CSVs found in {results_dir}")
+    return pd.concat(frames, ignore_index=True)
+
+
+def seed_outcomes(raw, metric=MEAN_FOOD):
+    """One row per condition × phase × seed: the metric averaged over generations."""
+    return (raw.groupby(["condition", "phase", "seed"], sort=False)[metric]
+               .mean().rename("value").reset_index())
+
+
+def _ci(values, level=CI_LEVEL):
+    n = len(values)
+    mean = float(np.mean(values))
+    if n < 2:
+        return mean, mean
+    half = stats.t.ppf(0.5 + level / 2.0, n - 1) * stats.sem(values)
+    return mean - half, mean + half
+
+
+def summary_statistics(outcomes):
+    rows = []
+    for (cond, phase), grp in outcomes.groupby(["condition", "phase"], sort=False):
+        values = grp["value"].to_numpy()
+        lo, hi = _ci(values)
+        rows.append({
+            "condition": cond, "phase": phase, "n": len(values),
+            "mean": float(np.mean(values)),
+            "sd": float(np.std(values, ddof=1)) if len(values) > 1 else 0.0,
+            "ci95_low": lo, "ci95_high": hi,
+        })
+    return pd.DataFrame(rows)
+
+
+def welch_comparison(a, b, level=CI_LEVEL):
+    """Welch's t-test of a vs b with Cohen's d and a CI on the mean difference."""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    va, vb = np.var(a, ddof=1), np.var(b, ddof=1)
+    na, nb = len(a), len(b)
+    t, p = stats.ttest_ind(a, b, equal_var=False)
+    se2 = va / na + vb / nb
+    df = se2 ** 2 / ((va / na) ** 2 / (na - 1) + (vb / nb) ** 2 / (nb - 1)) if se2 > 0 else np.nan
+    diff = float(np.mean(a) - np.mean(b))
+    half = stats.t.ppf(0.5 + level / 2.0, df) * np.sqrt(se2) if se2 > 0 else 0.0
+    pooled = np.sqrt((va + vb) / 2.0)
+    return {
+        "t": float(t), "df": float(df), "p": float(p),
+        "cohens_d": diff / pooled if pooled > 0 else 0.0,
+        "mean_diff": diff, "ci95_low": diff - half, "ci95_high": diff + half,
+    }
+
+
+def statistical_tests(outcomes):
+    rows = []
+    for phase in PHASES:
+        in_phase = outcomes[outcomes["phase"] == phase]
+        present = [c for c in CONDITIONS if (in_phase["condition"] == c).any()]
+        for a, b in itertools.combinations(present, 2):
+            va = in_phase.loc[in_phase["condition"] == a, "value"]
+            vb = in_phase.loc[in_phase["condition"] == b, "value"]
+            if len(va) < 2 or len(vb) < 2:
+                continue
+            rows.append({"phase": phase, "comparison": f"{a.upper()} vs {b.upper()}",
+                         **welch_comparison(va, vb)})
+    return pd.DataFrame(rows)
+
+
+def run_analysis(results_dir, raw=None):
+    """Write summary_statistics.csv and statistical_tests.csv. Returns their paths.
+    raw defaults to load_raw(results_dir)."""
+    outcomes = seed_outcomes(load_raw(results_dir) if raw is None else raw)
+    summary_path = os.path.join(results_dir, "summary_statistics.csv")
+    tests_path = os.path.join(results_dir, "statistical_tests.csv")
+    summary_statistics(outcomes).to_csv(summary_path, index=False)
+    statistical_tests(outcomes).to_csv(tests_path, index=False)
+    return summary_path, tests_path
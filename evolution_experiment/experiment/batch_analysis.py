@@ -0,0 +1,205 @@
+"""
+Batched per-generation statistics over a (metric, generation, seed, condition) array.
+
+experiment.analysis compares conditions once per phase, on each seed's mean
+over the phase. This module runs the same comparisons for every metric and
+every generation at once. The raw CSVs of a phase are packed into one array
+`values[metric, generation, seed, condition]`, with NaN for missing cells
+(e.g. a seed one condition does not have). Every statistic is then a
+NaN-aware reduction over the seed axis:
+
+  - Welch's t-test, Cohen's d and the t-interval on the mean difference,
+    with the same formulas as analysis.welch_comparison
+  - a percentile bootstrap CI on the mean difference. Resamples are drawn
+    once per condition, as seed indices, and turned into a (n_boot, seeds)
+    count matrix. A bootstrap mean of every metric × generation is then one
+    matrix product, and the same resamples are reused for all of them
+  - Holm (default), Bonferroni or Benjamini–Hochberg adjusted p-values over
+    the whole table
+
+The output has the columns of statistical_tests.csv plus `metric`,
+`generation`, `p_adjusted` and the bootstrap CI.
+
+Running:
+    python -m experiment.cli analyze --per-generation
+writes generation_tests.csv next to the usual tables.
+"""
+
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from experiment.analysis import CI_LEVEL, load_raw
+from experiment.raw_data import (
+    CONDITIONS, PHASES, POPULATION, MEAN_FOOD, TRAIT_MEANS, TRAIT_SDS,
+)
+
+METRICS = (POPULATION, MEAN_FOOD) + tuple(TRAIT_MEANS.values()) + tuple(TRAIT_SDS.values())
+DEFAULT_N_BOOT = 2000
+CORRECTIONS = ("holm", "bonferroni", "fdr_bh", "none")
+
+
+# ─── Packing ─────────────────────────────────────────────────────────────────
+
+def phase_array(raw, phase, metrics=METRICS, conds=CONDITIONS):
+    """Pack one phase of the raw table into values[metric, generation, seed, condition].
+
+    Returns (values, metrics, generations, seeds, conds); only metrics and
+    conditions present in raw are kept."""
+    raw = raw[raw["phase"] == phase]
+    metrics = tuple(m for m in metrics if m in raw)
+    conds = tuple(c for c in conds if (raw["condition"] == c).any())
+    generations, g = np.unique(raw["generation"].to_numpy(), return_inverse=True)
+    seeds, s = np.unique(raw["seed"].to_numpy(), return_inverse=True)
+    c = pd.Categorical(raw["condition"], categories=conds).codes
+
+    values = np.full((len(metrics), len(generations), len(seeds), len(conds)), np.nan)
+    values[:, g, s, c] = raw[list(metrics)].to_numpy(dtype=float).T
+    return values, metrics, generations, seeds, conds
+
+
+# ─── Vectorised statistics ───────────────────────────────────────────────────
+
+def _moments(x):
+    """Count, mean and sample variance over the last axis, ignoring NaN."""
+    mask = ~np.isnan(x)
+    n = mask.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(mask, x, 0.0).sum(axis=-1) / n
+        dev = np.where(mask, x - mean[..., np.newaxis], 0.0)
+        var = (dev * dev).sum(axis=-1) / (n - 1)
+    return n, mean, var
+
+
+def welch_batch(a, b, level=CI_LEVEL):
+    """welch_comparison for every leading index of a and b at once.
+
+    a and b hold seeds on their last axis (NaN = missing). Returns a dict of
+    arrays with the keys of welch_comparison, plus the group sizes n_a, n_b."""
+    na, mean_a, va = _moments(a)
+    nb, mean_b, vb = _moments(b)
+    diff = mean_a - mean_b
+    with np.errstate(divide="ignore", invalid="ignore"):
+        se2 = va / na + vb / nb
+        df = np.where(se2 > 0,
+                      se2 ** 2 / ((va / na) ** 2 / (na - 1) + (vb / nb) ** 2 / (nb - 1)),
+                      np.nan)
+        t = diff / np.sqrt(se2)
+        p = 2.0 * stats.t.sf(np.abs(t), df)
+        half = np.where(se2 > 0, stats.t.ppf(0.5 + level / 2.0, df) * np.sqrt(se2), 0.0)
+        pooled = np.sqrt((va + vb) / 2.0)
+        d = np.where(pooled > 0, diff / pooled, 0.0)
+    return {
+        "n_a": na, "n_b": nb, "t": t, "df": df, "p": p, "cohens_d": d,
+        "mean_diff": diff, "ci95_low": diff - half, "ci95_high": diff + half,
+    }
+
+
+def resampling_weights(n_seeds, n_boot, rng):
+    """Bootstrap resamples of n_seeds seed slots as a (n_boot, n_seeds) count
+    matrix: entry [b, s] is how often slot s was drawn in resample b."""
+    idx = rng.integers(0, n_seeds, size=(n_boot, n_seeds))
+    weights = np.zeros((n_boot, n_seeds))
+    np.add.at(weights, (np.arange(n_boot)[:, np.newaxis], idx), 1.0)
+    return weights
+
+
+def bootstrap_means(x, weights):
+    """Bootstrap means of x (seeds on the last axis, NaN = missing) for every
+    resample in weights. Returns shape x.shape[:-1] + (n_boot,). Missing seeds
+    drop out of the resample they were drawn into."""
+    mask = ~np.isnan(x)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (np.where(mask, x, 0.0) @ weights.T) / (mask.astype(float) @ weights.T)
+
+
+def bootstrap_diff_ci(a, b, weights_a, weights_b, level=CI_LEVEL):
+    """Percentile bootstrap CI of mean(a) - mean(b), resampling each group
+    independently with its own weights."""
+    boot = bootstrap_means(a, weights_a) - bootstrap_means(b, weights_b)
+    tail = (1.0 - level) / 2.0
+    with np.errstate(invalid="ignore"):
+        low, high = np.nanquantile(boot, [tail, 1.0 - tail], axis=-1)
+    return low, high
+
+
+def adjust_pvalues(p, method="holm"):
+    """Family-wise (holm, bonferroni) or false-discovery-rate (fdr_bh)
+    adjusted p-values. NaN entries are left out of the family."""
+    p = np.asarray(p, dtype=float)
+    out = np.full(p.shape, np.nan)
+    ok = ~np.isnan(p)
+    q = p[ok]
+    m = len(q)
+    if method == "none" or m == 0:
+        out[ok] = q
+        return out
+    if method == "bonferroni":
+        out[ok] = np.minimum(q * m, 1.0)
+        return out
+
+    order = np.argsort(q, kind="mergesort")
+    ranked = q[order]
+    if method == "holm":
+        adj = np.maximum.accumulate(ranked * (m - np.arange(m)))
+    elif method == "fdr_bh":
+        adj = np.minimum.accumulate((ranked * m / np.arange(1, m + 1))[::-1])[::-1]
+    else:
+        raise ValueError(f"Unknown correction: {method!r} (choose from {', '.join(CORRECTIONS)})")
+    adjusted = np.empty(m)
+    adjusted[order] = np.minimum(adj, 1.0)
+    out[ok] = adjusted
+    return out
+
+
+# ─── Tables ──────────────────────────────────────────────────────────────────
+
+def generation_tests(raw, metrics=METRICS, n_boot=DEFAULT_N_BOOT, correction="holm",
+                     level=CI_LEVEL, seed=0):
+    """Every pairwise condition comparison for every phase × metric × generation.
+
+    One row per test, in the layout of statistical_tests.csv plus metric,
+    generation, p_adjusted and (if n_boot) boot_ci95_low/high. Tests where a
+    condition has fewer than two seeds are omitted, as in the phase-level
+    table."""
+    rng = np.random.default_rng(seed)
+    tables = []
+    for phase in PHASES:
+        values, ms, generations, seeds, conds = phase_array(raw, phase, metrics)
+        if values.size == 0:
+            continue
+        weights = [resampling_weights(len(seeds), n_boot, rng) for _ in conds] if n_boot else None
+        for ia, ib in itertools.combinations(range(len(conds)), 2):
+            a, b = values[..., ia], values[..., ib]
+            res = welch_batch(a, b, level)
+            if weights is not None:
+                res["boot_ci95_low"], res["boot_ci95_high"] = bootstrap_diff_ci(
+                    a, b, weights[ia], weights[ib], level)
+            keep = (res.pop("n_a") >= 2) & (res.pop("n_b") >= 2)
+            mi, gi = np.nonzero(keep)
+            table = pd.DataFrame({
+                "phase": phase,
+                "comparison": f"{conds[ia].upper()} vs {conds[ib].upper()}",
+                "metric": np.asarray(ms, dtype=object)[mi],
+                "generation": generations[gi],
+                **{k: v[keep] for k, v in res.items()},
+            })
+            tables.append(table)
+    if not tables:
+        return pd.DataFrame()
+    out = pd.concat(tables, ignore_index=True)
+    out.insert(out.columns.get_loc("p") + 1, "p_adjusted", adjust_pvalues(out["p"], correction))
+    return out
+
+
+def run_generation_analysis(results_dir, n_boot=DEFAULT_N_BOOT, correction="holm", seed=0,
+                            raw=None):
+    """Write generation_tests.csv. Returns its path. raw defaults to load_raw(results_dir)."""
+    path = os.path.join(results_dir, "generation_tests.csv")
+    raw = load_raw(results_dir) if raw is None else raw
+    generation_tests(raw, n_boot=n_boot, correction=correction,
+                     seed=seed).to_csv(path, index=False)
+    return path
@@ -0,0 +1,324 @@
+"""
+Subcommand CLI for the experiment.
+
+    python -m experiment.cli simulate [--seeds 30] [--conditions evo opt rnd] [--islands 4]
+    python -m experiment.cli sequential --ci-half-width 0.05 [--max-seeds 30]
+    python -m experiment.cli transfer-suite [--seeds 30] [--environments ...]
+    python -m experiment.cli analyze [--per-generation] [--store CONFIG]
+    python -m experiment.cli store import|export|compact|info
+    python -m experiment.cli plot
+    python -m experiment.cli status
+
+Heavy libraries are imported inside the subcommand that needs them:
+`simulate` loads only NumPy and the simulator package, `analyze` adds
+pandas/scipy, `plot` adds matplotlib, and `status` uses the standard library.
+Keep module-level imports here stdlib-only.
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+DEFAULT_RESULTS_DIR = "results"
+DEFAULT_SEEDS = 30
+
+_OUTPUTS = ("summary_statistics.csv", "statistical_tests.csv",
+            "fig1_population.png", "fig2_mean_food.png", "fig3_trait_evolution.png",
+            "fig4_transfer_bars.png", "fig5_diversity.png")
+
+
+def cmd_simulate(args):
+    from experiment import conditions
+    from experiment.raw_data import (
+        write_raw_csv, write_raw_csvs, lineage_path, events_path, write_events_csv,
+    )
+    from simulator.precision import set_float_dtype
+
+    if args.islands and (args.lineage or args.events or args.memory_profile):
+        raise SystemExit("--islands trains EVO in worker processes; it cannot be combined "
+                         "with --lineage, --events or --memory-profile")
+    set_float_dtype(args.dtype)
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    runs = {cond: [] for cond in args.conditions}
+    events = {cond: [] for cond in args.conditions}
+    island_rows = []
+    budgets = {}
+    profiles = []
+    writer = None
+    if args.store:
+        from experiment.results_store import StoreWriter, store_path
+
+        writer = StoreWriter(store_path(args.results_dir))
+
+    def run(cond, seed, fn, *fn_args, **fn_kwargs):
+        with contextlib.ExitStack() as stack:
+            if args.lineage and cond == "evo":
+                from simulator.lineage import LineageRecorder
+
+                path = lineage_path(args.results_dir, cond, seed)
+                if os.path.exists(path):
+                    os.remove(path)
+                stack.enter_context(LineageRecorder(path, seed=seed))
+            if args.memory_profile:
+                from simulator.instrumentation import MemoryInstrumentation
+
+                mem = stack.enter_context(MemoryInstrumentation())
+                profiles.append(({"condition": cond, "seed": seed}, mem))
+            rec = None
+            if args.events and cond in events:
+                from simulator.events import EventRecorder
+
+                rec = stack.enter_context(EventRecorder())
+            result = fn(seed, *fn_args, **fn_kwargs)
+        if rec is not None:
+            events[cond].extend((seed,) + entry for entry in rec.logs)
+        return result
+
+    def record(cond, seed, train, transfer):
+        runs[cond].append((seed, train, transfer))
+        if writer is not None:
+            writer.append_run(cond, seed, train, transfer, config=args.store)
+
+    run_evo = conditions.run_evo
+    if args.islands:
+        from experiment.islands import run_evo_islands
+
+        def run_evo(seed):
+            rows, train, transfer, steps = run_evo_islands(
+                seed, n_islands=args.islands, migration_interval=args.migration_interval,
+                n_migrants=args.migrants, topology=args.topology)
+            island_rows.extend({"seed": seed, **row} for row in rows)
+            return train, transfer, steps
+
+    start = time.time()
+    for seed in seeds:
+        if "evo" in runs or "opt" in runs:
+            train, transfer, steps = run("evo", seed, run_evo)
+            budgets[seed] = steps
+            if "evo" in runs:
+                record("evo", seed, train, transfer)
+        if "opt" in runs:
+            train, transfer = run("opt", seed, conditions.run_opt, budgets[seed],
+                                  search=args.opt_search)
+            record("opt", seed, train, transfer)
+        if "rnd" in runs:
+            train, transfer = run("rnd", seed, conditions.run_rnd)
+            record("rnd", seed, train, transfer)
+
+    for path in write_raw_csvs(runs, args.results_dir):
+        print(f"Wrote {path}")
+    if island_rows:
+        path = write_raw_csv(os.path.join(args.results_dir, "evo_islands.csv"), island_rows)
+        print(f"Wrote {path}")
+    if args.events:
+        for cond in args.conditions:
+            path = write_events_csv(events_path(args.results_dir, cond), events[cond])
+            print(f"Wrote {path}")
+    if profiles:
+        path = os.path.join(args.results_dir, "memory_profile.csv")
+        rows = [{**extra, **r} for extra, mem in profiles for r in mem.rows]
+        write_raw_csv(path, rows)
+        print(f"Wrote {path}")
+    print(f"Simulated {len(seeds)} seeds in {time.time() - start:.1f}s")
+
+
+def cmd_sequential(args):
+    from experiment.sequential import run_and_save
+
+    for path in run_and_save(
+            args.results_dir, conds=tuple(args.conditions),
+            target_half_width=args.ci_half_width, alpha=args.alpha,
+            batch_size=args.batch_size, min_seeds=args.min_seeds,
+            max_seeds=args.max_seeds, first_seed=args.first_seed,
+            workers=args.workers, opt_search=args.opt_search):
+        print(f"Wrote {path}")
+
+
+def cmd_transfer_suite(args):
+    from experiment.transfer_suite import TRANSFER_SUITE, run_and_save
+
+    suite = TRANSFER_SUITE
+    if args.environments:
+        by_name = {env["name"]: env for env in TRANSFER_SUITE}
+        unknown = [n for n in args.environments if n not in by_name]
+        if unknown:
+            raise SystemExit(f"Unknown environments: {', '.join(unknown)} "
+                             f"(choose from {', '.join(by_name)})")
+        suite = tuple(by_name[n] for n in args.environments)
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    for path in run_and_save(args.results_dir, seeds, conds=tuple(args.conditions),
+                             suite=suite, workers=args.workers,
+                             opt_search=args.opt_search,
+                             reuse_snapshots=not args.retrain):
+        print(f"Wrote {path}")
+
+
+def cmd_analyze(args):
+    from experiment.analysis import run_analysis
+
+    raw = None
+    if args.store:
+        from experiment.results_store import ResultsStore, store_path
+
+        raw = ResultsStore(store_path(args.results_dir)).to_frame(config=args.store)
+        if raw.empty:
+            raise SystemExit(f"No rows for config {args.store!r} in the results store")
+    for path in run_analysis(args.results_dir, raw=raw):
+        print(f"Wrote {path}")
+    if args.per_generation:
+        from experiment.batch_analysis import run_generation_analysis
+
+        path = run_generation_analysis(args.results_dir, n_boot=args.bootstrap,
+                                       correction=args.correction, raw=raw)
+        print(f"Wrote {path}")
+
+
+def cmd_store(args):
+    from experiment.results_store import ResultsStore, import_csvs, store_path
+
+    root = store_path(args.results_dir)
+    if args.action == "import":
+        n = import_csvs(args.results_dir, root, config=args.config)
+        print(f"Imported {n} rows into {root} (config {args.config!r})")
+        return
+    store = ResultsStore(root)
+    if args.action == "export":
+        for path in store.export_csvs(args.results_dir, config=args.config):
+            print(f"Wrote {path}")
+    elif args.action == "compact":
+        store.compact()
+        print(f"Compacted {root}: {len(store)} rows in {len(store.segments)} segment(s)")
+    else:
+        print(f"{root}: {len(store)} rows in {len(store.segments)} segment(s)")
+        for config in store.configs:
+            print(f"  config {config!r}")
+
+
+def cmd_plot(args):
+    from experiment.figures import FIGURES, make_figures
+
+    unknown = [n for n in args.figures if n not in FIGURES]
+    if unknown:
+        raise SystemExit(f"Unknown figures: {', '.join(unknown)} "
+                         f"(choose from {', '.join(FIGURES)})")
+    written, skipped = make_figures(args.results_dir, names=args.figures,
+                                    workers=args.workers, force=args.force)
+    for path in written:
+        print(f"Wrote {path}")
+    for name in skipped:
+        print(f"Up to date: {name}")
+
+
+def cmd_status(args):
+    from experiment.raw_data import CONDITIONS, raw_path, seeds_in
+
+    for cond in CONDITIONS:
+        path = raw_path(args.results_dir, cond)
+        if os.path.exists(path):
+            seeds = seeds_in(path)
+            print(f"{cond.upper()}: {len(seeds)} seeds ({os.path.basename(path)})")
+        else:
+            print(f"{cond.upper()}: no results")
+    for name in _OUTPUTS:
+        mark = "x" if os.path.exists(os.path.join(args.results_dir, name)) else " "
+        print(f"  [{mark}] {name}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m experiment.cli")
+    parser.add_argument("--results-dir", default=DEFAULT_RESULTS_DIR)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("simulate", help="run conditions and write <condition>_raw.csv")
+    p.add_argument("--seeds", type=int, default=DEFAULT_SEEDS)
+    p.add_argument("--first-seed", type=int, default=0)
+    p.add_argument("--conditions", nargs="+", default=["evo", "opt", "rnd"],
+                   choices=["evo", "opt", "rnd"])
+    p.add_argument("--opt-search", default="hill", choices=["hill", "surrogate"],
+                   help="OPT search strategy (same creature-step budget either way)")
+    p.add_argument("--dtype", default="float64", choices=["float64", "float32"],
+                   help="engine float precision (check drift with experiment.parity)")
+    p.add_argument("--memory-profile", action="store_true",
+                   help="record per-generation allocations and peak memory "
+                        "(memory_profile.csv; slows the run down)")
+    p.add_argument("--lineage", action="store_true",
+                   help="record EVO genealogy to lineage/evo_seed<N>.bin")
+    p.add_argument("--islands", type=int, default=0, metavar="K",
+                   help="train EVO as K islands with migration (evo_islands.csv has "
+                        "the per-island rows)")
+    p.add_argument("--migration-interval", type=int, default=10,
+                   help="generations between migrations (with --islands)")
+    p.add_argument("--migrants", type=int, default=2,
+                   help="survivors each island sends per neighbour (with --islands)")
+    p.add_argument("--topology", default="ring", choices=["ring", "full"],
+                   help="island neighbourhood (with --islands)")
+    p.add_argument("--events", action="store_true",
+                   help="record every eat/kill event to <condition>_events.csv")
+    p.add_argument("--store", metavar="CONFIG", default=None,
+                   help="also append results to the results store under this config label")
+    p.set_defaults(fn=cmd_simulate)
+
+    p = sub.add_parser("sequential",
+                       help="add seeds in batches until CIs reach a target half-width")
+    p.add_argument("--ci-half-width", type=float, required=True)
+    p.add_argument("--alpha", type=float, default=0.05)
+    p.add_argument("--batch-size", type=int, default=5)
+    p.add_argument("--min-seeds", type=int, default=5)
+    p.add_argument("--max-seeds", type=int, default=DEFAULT_SEEDS)
+    p.add_argument("--first-seed", type=int, default=0)
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--conditions", nargs="+", default=["evo", "opt", "rnd"],
+                   choices=["evo", "opt", "rnd"])
+    p.add_argument("--opt-search", default="hill", choices=["hill", "surrogate"])
+    p.set_defaults(fn=cmd_sequential)
+
+    p = sub.add_parser("transfer-suite",
+                       help="branch many transfer environments from one training run per seed")
+    p.add_argument("--seeds", type=int, default=DEFAULT_SEEDS)
+    p.add_argument("--first-seed", type=int, default=0)
+    p.add_argument("--conditions", nargs="+", default=["evo", "opt", "rnd"],
+                   choices=["evo", "opt", "rnd"])
+    p.add_argument("--environments", nargs="+", default=None,
+                   help="subset of the suite by name (default: all)")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--opt-search", default="hill", choices=["hill", "surrogate"])
+    p.add_argument("--retrain", action="store_true",
+                   help="ignore saved training snapshots")
+    p.set_defaults(fn=cmd_transfer_suite)
+
+    p = sub.add_parser("analyze", help="write summary and test tables")
+    p.add_argument("--per-generation", action="store_true",
+                   help="also test every metric × generation (generation_tests.csv)")
+    p.add_argument("--bootstrap", type=int, default=2000,
+                   help="bootstrap resamples for --per-generation CIs (0 to skip)")
+    p.add_argument("--correction", default="holm",
+                   choices=["holm", "bonferroni", "fdr_bh", "none"],
+                   help="multiple-comparison correction for --per-generation p-values")
+    p.add_argument("--store", metavar="CONFIG", default=None,
+                   help="read this config from the results store instead of the raw CSVs")
+    p.set_defaults(fn=cmd_analyze)
+
+    p = sub.add_parser("store", help="manage the memory-mapped results store")
+    p.add_argument("action", choices=["import", "export", "compact", "info"])
+    p.add_argument("--config", default="default",
+                   help="config label to import into or export from")
+    p.set_defaults(fn=cmd_store)
+    p = sub.add_parser("plot", help="render figures whose data or code changed")
+    p.add_argument("figures", nargs="*", help="figure names (default: all)")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--force", action="store_true", help="re-render even if up to date")
+    p.set_defaults(fn=cmd_plot)
+    sub.add_parser("status", help="show what has been produced").set_defaults(fn=cmd_status)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.fn(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,10 +4,11 @@ All use the same simulation engine with the same computational budget.
 """
 
 import numpy as np
-from simulator.creature import Creature
+from simulator.creature import Creature, reset_uids
 from simulator.stage import SquareStage
 from simulator.simulation import Simulation, evo_reproduce, clone_reproduce, collect_metrics
 from simulator.generation import Generation
+from experiment.surrogate import GaussianProcess, expected_improvement
 
 
 # ─── Environment configuration ───────────────────────────────────────────────
@@ -22,8 +23,17 @@ TRANSFER_GENERATIONS = 20
 TRANSFER_N_CLUSTERS = 5
 TRANSFER_CLUSTER_SD = 30.0
 
+BASELINE_ENV = "baseline"
+
 N_CREATURES = 50
 
+# OPT surrogate search: (low, high) for speed, size, sense range. The upper
+# limits match the trait ranges RND draws from. Hill-climbing (the reference
+# OPT search) only keeps the lower floors and is unbounded above.
+OPT_BOUNDS = ((0.01, 20.0), (0.01, 20.0), (0.0, 40.0))
+SURROGATE_N_INIT = 8
+SURROGATE_N_CANDIDATES = 512
+
 DEFAULT_TRAITS = dict(
     speed=(10.0, 0.5),
     size=(10.0, 0.5),
@@ -54,6 +64,30 @@ def _make_transfer_food_fn(stage_size, n_food, n_clusters, cluster_sd):
     return fn
 
 
+def transfer_env(name=BASELINE_ENV, **overrides):
+    """Environment B as a dict, built from the TRANSFER_* settings at call
+    time so that overrides of those settings apply. Transfer functions take
+    an environment like this one; see experiment/transfer_suite.py for the
+    variants. n_clusters=0 means uniform food."""
+    env = dict(
+        name=name,
+        stage_size=TRANSFER_STAGE_SIZE,
+        n_food=TRANSFER_FOOD,
+        n_clusters=TRANSFER_N_CLUSTERS,
+        cluster_sd=TRANSFER_CLUSTER_SD,
+        generations=TRANSFER_GENERATIONS,
+    )
+    env.update(overrides)
+    return env
+
+
+def _make_env_food_fn(env):
+    if env["n_clusters"] == 0:
+        return _make_training_food_fn(env["stage_size"], env["n_food"])
+    return _make_transfer_food_fn(
+        env["stage_size"], env["n_food"], env["n_clusters"], env["cluster_sd"])
+
+
 def _make_creatures(n, stage, rng, **trait_overrides):
     """Create n creatures at random edge positions."""
     traits = {**DEFAULT_TRAITS, **trait_overrides}
@@ -92,7 +126,20 @@ def _make_creatures_fixed(n, stage, rng, speed_val, size_val, sense_val):
 def run_evo(seed, progress_prefix="[EVO]"):
     """Run evolutionary condition: natural selection + mutation.
     Returns (train_metrics, transfer_metrics, total_creature_steps)."""
+    train_metrics, survivors, train_steps, rng = train_evo(seed, progress_prefix)
+
+    transfer_metrics, transfer_steps = _run_evo_transfer(
+        survivors, rng, seed, progress_prefix)
+
+    return train_metrics, transfer_metrics, train_steps + transfer_steps
+
+
+def train_evo(seed, progress_prefix="[EVO]"):
+    """EVO training phase only.
+    Returns (train_metrics, survivors, train_steps, rng); the transfer phase
+    continues from rng."""
     rng = np.random.default_rng(seed)
+    reset_uids()
 
     # Training phase
     train_stage = SquareStage(TRAIN_STAGE_SIZE)
@@ -108,69 +155,148 @@ def run_evo(seed, progress_prefix="[EVO]"):
         creatures, TRAIN_GENERATIONS, evo_reproduce, food_fn,
         phase_label="train", progress_fn=prog)
 
-    # Transfer phase
-    transfer_stage = SquareStage(TRANSFER_STAGE_SIZE)
+    return train_metrics, survivors, train_steps, rng
+
+
+def _relocate_creature(c, stage, rng):
+    """Copy a creature's identity, traits and age onto a fresh creature at a
+    random edge position of another stage."""
+    loc = stage.get_random_location(rng)
+    pos = stage.get_nearest_edge_point(loc)
+    return Creature(
+        pos=pos,
+        speed=c.speed,
+        size=c.size,
+        sense_range=c.sense_range_trait,
+        reach=c.reach_trait,
+        flee_distance=c.flee_distance,
+        life_span=c.life_span,
+        energy=c.energy,
+        age=c.age,
+        uid=c.uid,
+        parent_uid=c.parent_uid,
+    )
+
+
+def _run_evo_transfer(survivors, rng, seed, progress_prefix, env=None):
+    """EVO transfer phase: survivors keep evolving in Environment B (or env).
+    Returns (transfer_metrics, transfer_steps)."""
+    env = env or transfer_env()
+    transfer_stage = SquareStage(env["stage_size"])
     sim_t = Simulation(transfer_stage, rng)
-    transfer_creatures = []
-    for c in survivors:
-        loc = transfer_stage.get_random_location(rng)
-        pos = transfer_stage.get_nearest_edge_point(loc)
-        new_c = Creature(
-            pos=pos,
-            speed=c.speed,
-            size=c.size,
-            sense_range=c.sense_range_trait,
-            reach=c.reach_trait,
-            flee_distance=c.flee_distance,
-            life_span=c.life_span,
-            energy=c.energy,
-            age=c.age,
-        )
-        transfer_creatures.append(new_c)
+    transfer_creatures = [_relocate_creature(c, transfer_stage, rng) for c in survivors]
 
     if not transfer_creatures:
         transfer_creatures = _make_creatures(N_CREATURES, transfer_stage, rng)
 
-    food_fn_t = _make_transfer_food_fn(
-        TRANSFER_STAGE_SIZE, TRANSFER_FOOD, TRANSFER_N_CLUSTERS, TRANSFER_CLUSTER_SD)
+    food_fn_t = _make_env_food_fn(env)
 
     def prog_t(g, t):
         if g % 10 == 0 or g == t:
             print(f"  {progress_prefix} Seed {seed}, Transfer Gen {g}/{t}")
 
     transfer_metrics, _, transfer_steps = sim_t.run(
-        transfer_creatures, TRANSFER_GENERATIONS, evo_reproduce, food_fn_t,
+        transfer_creatures, env["generations"], evo_reproduce, food_fn_t,
         phase_label="transfer", progress_fn=prog_t)
 
-    return train_metrics, transfer_metrics, train_steps + transfer_steps
+    return transfer_metrics, transfer_steps
 
 
 # ─── OPT condition ───────────────────────────────────────────────────────────
 
-def run_opt(seed, evo_budget, progress_prefix="[OPT]"):
-    """Run hill-climbing optimization condition.
-    Uses evo_budget total creature-steps for the search phase."""
+def run_opt(seed, evo_budget, progress_prefix="[OPT]", search="hill"):
+    """Run the optimization condition.
+    Uses evo_budget total creature-steps for the search phase. search is
+    "hill" (single-trait hill-climbing) or "surrogate" (GP-guided search);
+    both charge the creature-steps of every simulated evaluation."""
+    train_metrics, best, rng = train_opt(seed, evo_budget, progress_prefix, search)
+    transfer_metrics, _ = _run_opt_transfer(best, rng, seed, progress_prefix)
+    return train_metrics, transfer_metrics
+
+
+def train_opt(seed, evo_budget, progress_prefix="[OPT]", search="hill"):
+    """OPT search and training phase only.
+    Returns (train_metrics, (speed, size, sense), rng); the transfer phase
+    continues from rng."""
     rng = np.random.default_rng(seed)
+    reset_uids()
 
     train_stage = SquareStage(TRAIN_STAGE_SIZE)
     food_fn = _make_training_food_fn(TRAIN_STAGE_SIZE, TRAIN_FOOD)
 
-    # Hill-climbing search
     best_speed, best_size, best_sense = 10.0, 10.0, 20.0
     best_score = _evaluate_config(
         best_speed, best_size, best_sense, train_stage, rng, food_fn)
 
-    budget_used = 0
-    trait_names = ['speed', 'size', 'sense_range']
-    perturbation_sd = 1.0
-    iteration = 0
-
     # Estimate cost of one evaluation (run one to measure)
     eval_cost = _estimate_eval_cost(best_speed, best_size, best_sense,
                                      train_stage, rng, food_fn)
-    budget_used += eval_cost
+    budget_used = eval_cost
+
+    if search == "hill":
+        print(f"  {progress_prefix} Seed {seed}, Hill-climbing (budget={evo_budget})...")
+        best_speed, best_size, best_sense, best_score = _hill_climb(
+            (best_speed, best_size, best_sense), best_score, budget_used, evo_budget,
+            train_stage, rng, food_fn, seed, progress_prefix)
+    elif search == "surrogate":
+        print(f"  {progress_prefix} Seed {seed}, Surrogate search (budget={evo_budget})...")
+        best_speed, best_size, best_sense, best_score = _surrogate_search(
+            (best_speed, best_size, best_sense), best_score, budget_used, evo_budget,
+            train_stage, rng, food_fn, seed, progress_prefix)
+    else:
+        raise ValueError(f"Unknown OPT search mode: {search!r}")
 
-    print(f"  {progress_prefix} Seed {seed}, Hill-climbing (budget={evo_budget})...")
+    print(f"  {progress_prefix} Seed {seed}, Search done. "
+          f"Best: speed={best_speed:.2f}, size={best_size:.2f}, "
+          f"sense={best_sense:.2f}, score={best_score:.2f}")
+
+    # Training phase: deploy best configuration for full run
+    sim = Simulation(train_stage, rng)
+    creatures = _make_creatures_fixed(
+        N_CREATURES, train_stage, rng, best_speed, best_size, best_sense)
+
+    def prog(g, t):
+        if g % 10 == 0 or g == t:
+            print(f"  {progress_prefix} Seed {seed}, Train Gen {g}/{t}")
+
+    train_metrics, survivors, _ = sim.run(
+        creatures, TRAIN_GENERATIONS, clone_reproduce, food_fn,
+        phase_label="train", progress_fn=prog)
+
+    return train_metrics, (best_speed, best_size, best_sense), rng
+
+
+def _run_opt_transfer(best, rng, seed, progress_prefix, env=None):
+    """OPT transfer phase: fresh clones of the best config in Environment B
+    (or env). Returns (transfer_metrics, transfer_steps)."""
+    best_speed, best_size, best_sense = best
+    env = env or transfer_env()
+    transfer_stage = SquareStage(env["stage_size"])
+    sim_t = Simulation(transfer_stage, rng)
+    transfer_creatures = _make_creatures_fixed(
+        N_CREATURES, transfer_stage, rng, best_speed, best_size, best_sense)
+
+    food_fn_t = _make_env_food_fn(env)
+
+    def prog_t(g, t):
+        if g % 10 == 0 or g == t:
+            print(f"  {progress_prefix} Seed {seed}, Transfer Gen {g}/{t}")
+
+    transfer_metrics, _, transfer_steps = sim_t.run(
+        transfer_creatures, env["generations"], clone_reproduce, food_fn_t,
+        phase_label="transfer", progress_fn=prog_t)
+
+    return transfer_metrics, transfer_steps
+
+
+def _hill_climb(best, best_score, budget_used, evo_budget, stage, rng, food_fn,
+                seed, progress_prefix):
+    """Accept/reject one random single-trait perturbation per evaluation.
+    Returns (speed, size, sense, score)."""
+    best_speed, best_size, best_sense = best
+    trait_names = ['speed', 'size', 'sense_range']
+    perturbation_sd = 1.0
+    iteration = 0
 
     while budget_used < evo_budget:
         trait_idx = rng.integers(len(trait_names))
@@ -186,7 +312,7 @@ def run_opt(seed, evo_budget, progress_prefix="[OPT]"):
             new_sense = max(new_sense + offset, 0.0)
 
         score, cost = _evaluate_config_with_cost(
-            new_speed, new_size, new_sense, train_stage, rng, food_fn)
+            new_speed, new_size, new_sense, stage, rng, food_fn)
         budget_used += cost
 
         if score > best_score:
@@ -199,41 +325,57 @@ def run_opt(seed, evo_budget, progress_prefix="[OPT]"):
                   f"budget {budget_used}/{evo_budget}, "
                   f"best_score={best_score:.2f}")
 
-    print(f"  {progress_prefix} Seed {seed}, Search done. "
-          f"Best: speed={best_speed:.2f}, size={best_size:.2f}, "
-          f"sense={best_sense:.2f}, score={best_score:.2f}")
+    return best_speed, best_size, best_sense, best_score
 
-    # Training phase: deploy best configuration for full run
-    sim = Simulation(train_stage, rng)
-    creatures = _make_creatures_fixed(
-        N_CREATURES, train_stage, rng, best_speed, best_size, best_sense)
 
-    def prog(g, t):
-        if g % 10 == 0 or g == t:
-            print(f"  {progress_prefix} Seed {seed}, Train Gen {g}/{t}")
+def _surrogate_search(best, best_score, budget_used, evo_budget, stage, rng, food_fn,
+                      seed, progress_prefix):
+    """GP-guided search: fit a surrogate to every evaluated config and simulate
+    only the candidate with the highest expected improvement.
 
-    train_metrics, survivors, _ = sim.run(
-        creatures, TRAIN_GENERATIONS, clone_reproduce, food_fn,
-        phase_label="train", progress_fn=prog)
+    Candidates are uniform samples over OPT_BOUNDS plus Gaussian perturbations
+    of the incumbent. Scores are noisy, so the returned config is the evaluated
+    point with the highest posterior mean. Returns (speed, size, sense, score)."""
+    bounds = np.array(OPT_BOUNDS)
+    X = [list(best)]
+    y = [best_score]
 
-    # Transfer phase
-    transfer_stage = SquareStage(TRANSFER_STAGE_SIZE)
-    sim_t = Simulation(transfer_stage, rng)
-    transfer_creatures = _make_creatures_fixed(
-        N_CREATURES, transfer_stage, rng, best_speed, best_size, best_sense)
+    def evaluate(x):
+        nonlocal budget_used
+        score, cost = _evaluate_config_with_cost(x[0], x[1], x[2], stage, rng, food_fn)
+        budget_used += cost
+        X.append(list(x))
+        y.append(score)
 
-    food_fn_t = _make_transfer_food_fn(
-        TRANSFER_STAGE_SIZE, TRANSFER_FOOD, TRANSFER_N_CLUSTERS, TRANSFER_CLUSTER_SD)
+    for _ in range(SURROGATE_N_INIT):
+        if budget_used >= evo_budget:
+            break
+        evaluate(rng.uniform(bounds[:, 0], bounds[:, 1]))
 
-    def prog_t(g, t):
-        if g % 10 == 0 or g == t:
-            print(f"  {progress_prefix} Seed {seed}, Transfer Gen {g}/{t}")
+    gp = GaussianProcess(bounds)
+    iteration = 0
+    while budget_used < evo_budget:
+        gp.fit(X, y)
+        mean_obs, _ = gp.predict(X)
+        incumbent = np.asarray(X[int(np.argmax(mean_obs))])
 
-    transfer_metrics, _, _ = sim_t.run(
-        transfer_creatures, TRANSFER_GENERATIONS, clone_reproduce, food_fn_t,
-        phase_label="transfer", progress_fn=prog_t)
+        local = incumbent + rng.normal(0, 1.0, size=(SURROGATE_N_CANDIDATES // 2, 3))
+        glob = rng.uniform(bounds[:, 0], bounds[:, 1],
+                           size=(SURROGATE_N_CANDIDATES - len(local), 3))
+        cand = np.clip(np.vstack([local, glob]), bounds[:, 0], bounds[:, 1])
+        mean, sd = gp.predict(cand)
+        evaluate(cand[int(np.argmax(expected_improvement(mean, sd, mean_obs.max())))])
 
-    return train_metrics, transfer_metrics
+        iteration += 1
+        if iteration % 50 == 0:
+            print(f"  {progress_prefix} Seed {seed}, Iter {iteration}, "
+                  f"budget {budget_used}/{evo_budget}, "
+                  f"best_pred={mean_obs.max():.2f}")
+
+    gp.fit(X, y)
+    mean_obs, _ = gp.predict(X)
+    k = int(np.argmax(mean_obs))
+    return float(X[k][0]), float(X[k][1]), float(X[k][2]), float(mean_obs[k])
 
 
 def _evaluate_config(speed, size, sense, stage, rng, food_fn):
@@ -242,7 +384,7 @@ def _evaluate_config(speed, size, sense, stage, rng, food_fn):
     food_positions = food_fn(rng)
     gen = Generation(creatures, food_positions, stage, rng)
     alive = [c for c in gen.creatures if c.is_alive()]
-    total_food = sum(len(c.foods_eaten) for c in gen.creatures)
+    total_food = sum(c.n_eaten for c in gen.creatures)
     return total_food / len(gen.creatures) if gen.creatures else 0.0
 
 
@@ -251,7 +393,7 @@ def _evaluate_config_with_cost(speed, size, sense, stage, rng, food_fn):
     creatures = _make_creatures_fixed(N_CREATURES, stage, rng, speed, size, sense)
     food_positions = food_fn(rng)
     gen = Generation(creatures, food_positions, stage, rng)
-    total_food = sum(len(c.foods_eaten) for c in gen.creatures)
+    total_food = sum(c.n_eaten for c in gen.creatures)
     score = total_food / len(gen.creatures) if gen.creatures else 0.0
     return score, gen.total_creature_steps
 
@@ -268,7 +410,15 @@ def _estimate_eval_cost(speed, size, sense, stage, rng, food_fn):
 
 def run_rnd(seed, progress_prefix="[RND]"):
     """Run random baseline: fresh random traits each generation."""
+    train_metrics, rng = train_rnd(seed, progress_prefix)
+    transfer_metrics, _ = _run_rnd_transfer(rng, seed, progress_prefix)
+    return train_metrics, transfer_metrics
+
+
+def train_rnd(seed, progress_prefix="[RND]"):
+    """RND training phase only. Returns (train_metrics, rng)."""
     rng = np.random.default_rng(seed)
+    reset_uids()
 
     # Training phase
     train_stage = SquareStage(TRAIN_STAGE_SIZE)
@@ -288,8 +438,14 @@ def run_rnd(seed, progress_prefix="[RND]"):
         creatures, TRAIN_GENERATIONS, rnd_reproduce, food_fn,
         phase_label="train", progress_fn=prog)
 
-    # Transfer phase
-    transfer_stage = SquareStage(TRANSFER_STAGE_SIZE)
+    return train_metrics, rng
+
+
+def _run_rnd_transfer(rng, seed, progress_prefix, env=None):
+    """RND transfer phase: fresh random creatures every generation in
+    Environment B (or env). Returns (transfer_metrics, transfer_steps)."""
+    env = env or transfer_env()
+    transfer_stage = SquareStage(env["stage_size"])
 
     def rnd_reproduce_t(creatures, rng_):
         return _make_random_creatures(N_CREATURES, transfer_stage, rng_)
@@ -297,18 +453,17 @@ def run_rnd(seed, progress_prefix="[RND]"):
     sim_t = Simulation(transfer_stage, rng)
     creatures_t = _make_random_creatures(N_CREATURES, transfer_stage, rng)
 
-    food_fn_t = _make_transfer_food_fn(
-        TRANSFER_STAGE_SIZE, TRANSFER_FOOD, TRANSFER_N_CLUSTERS, TRANSFER_CLUSTER_SD)
+    food_fn_t = _make_env_food_fn(env)
 
     def prog_t(g, t):
         if g % 10 == 0 or g == t:
             print(f"  {progress_prefix} Seed {seed}, Transfer Gen {g}/{t}")
 
-    transfer_metrics, _, _ = sim_t.run(
-        creatures_t, TRANSFER_GENERATIONS, rnd_reproduce_t, food_fn_t,
+    transfer_metrics, _, transfer_steps = sim_t.run(
+        creatures_t, env["generations"], rnd_reproduce_t, food_fn_t,
         phase_label="transfer", progress_fn=prog_t)
 
-    return train_metrics, transfer_metrics
+    return transfer_metrics, transfer_steps
 
 
 def _make_random_creatures(n, stage, rng):
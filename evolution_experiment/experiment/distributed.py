@@ -0,0 +1,569 @@
+"""
+Shared-filesystem work queue for running experiment seeds across nodes.
+
+Tasks are (condition, seed, config) records published into a directory that
+every node can see (e.g. an NFS mount). Claims and lease reclamation rely only
+on atomic ``os.rename`` within one directory, and results are written to a
+temporary file and moved into place with ``os.replace``, so no broker is needed.
+
+Queue layout:
+    tasks/<id>.json     immutable task description
+    pending/<id>        claimable marker
+    leases/<id>         claimed task; mtime is the lease heartbeat
+    results/<id>.pkl    finished result (presence == task complete)
+    failed/<id>         task given up on after max_attempts (JSON, last error)
+
+Markers and leases hold JSON claim info, including the number of attempts
+so far; it travels with the file through every rename. A task whose run
+raised goes back to pending, or to failed/ once it has had max_attempts, as
+does an expired lease. OPT tasks whose EVO task failed fail with it.
+
+A claim renames the marker to a private name in leases/, stamps it, and only
+then renames it to leases/<id>, so a fresh lease never carries the marker's
+publish-time mtime. Lease expiry compares a lease file's mtime against the
+local clock, so node clocks should be NTP-synchronised. A worker whose lease expired mid-task may
+still publish its result; runs are deterministic per seed, so a duplicate
+result from the reclaiming worker is identical and last-writer-wins is safe.
+
+Usage:
+    python -m experiment.distributed publish QUEUE --seeds 30
+    python -m experiment.distributed work QUEUE          (on every node)
+    python -m experiment.distributed local QUEUE -j 4    (local stand-in nodes)
+    python -m experiment.distributed merge QUEUE results/
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import pickle
+import socket
+import sys
+import threading
+import time
+import traceback
+
+from experiment import conditions
+from experiment.raw_data import write_raw_csvs
+
+CONDITIONS = ("evo", "rnd", "opt")
+# EVO first (OPT needs its budget), then RND, then OPT.
+_PRIORITY = {"evo": 0, "rnd": 1, "opt": 2}
+
+DEFAULT_LEASE_SECONDS = 600.0
+DEFAULT_POLL_SECONDS = 5.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+_SUBDIRS = ("tasks", "pending", "leases", "results", "failed")
+_CLAIM_SUFFIX = ".claim"
+
+
+# ─── Queue layout ────────────────────────────────────────────────────────────
+
+def task_id(condition, seed):
+    return f"{_PRIORITY[condition]}-{condition}-seed{seed:05d}"
+
+
+def _path(queue_dir, sub, name=""):
+    return os.path.join(queue_dir, sub, name)
+
+
+def _init_queue(queue_dir):
+    for sub in _SUBDIRS:
+        os.makedirs(_path(queue_dir, sub), exist_ok=True)
+
+
+def _atomic_write_bytes(path, data):
+    """Write to a uniquely named sibling temp file, then rename into place."""
+    tmp = os.path.join(
+        os.path.dirname(path),
+        f".{os.path.basename(path)}.{socket.gethostname()}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+def _load_task(queue_dir, tid):
+    with open(_path(queue_dir, "tasks", f"{tid}.json")) as fh:
+        return json.load(fh)
+
+
+def _has_result(queue_dir, tid):
+    return os.path.exists(_path(queue_dir, "results", f"{tid}.pkl"))
+
+
+def _has_failed(queue_dir, tid):
+    return os.path.exists(_path(queue_dir, "failed", tid))
+
+
+def _load_result(queue_dir, tid):
+    with open(_path(queue_dir, "results", f"{tid}.pkl"), "rb") as fh:
+        return pickle.load(fh)
+
+
+# ─── Publishing ──────────────────────────────────────────────────────────────
+
+def publish_tasks(queue_dir, seeds, conds=CONDITIONS, config=None):
+    """Publish one task per (condition, seed). Already-published tasks are left
+    untouched, so publishing is idempotent and safe to re-run.
+
+    config maps module-level constants of experiment.conditions (e.g.
+    TRAIN_GENERATIONS) to override values for every task.
+    Returns the list of task ids."""
+    config = dict(config or {})
+    _check_config(config)
+    _init_queue(queue_dir)
+
+    ids = []
+    for cond in conds:
+        if cond not in _PRIORITY:
+            raise ValueError(f"Unknown condition: {cond!r}")
+        for seed in seeds:
+            tid = task_id(cond, seed)
+            ids.append(tid)
+            task_path = _path(queue_dir, "tasks", f"{tid}.json")
+            if os.path.exists(task_path):
+                continue
+            task = {"id": tid, "condition": cond, "seed": int(seed), "config": config}
+            if cond == "opt":
+                task["budget_from"] = task_id("evo", seed)
+            _atomic_write_bytes(task_path, json.dumps(task, sort_keys=True).encode())
+            open(_path(queue_dir, "pending", tid), "a").close()
+    return ids
+
+
+def _check_config(config):
+    for key in config:
+        if not key.isupper() or not hasattr(conditions, key):
+            raise ValueError(f"Unknown experiment setting: {key!r}")
+
+
+# ─── Claims and leases ───────────────────────────────────────────────────────
+
+def _claim_path(queue_dir, tid, worker_id):
+    return _path(queue_dir, "leases", f".{tid}.{worker_id}{_CLAIM_SUFFIX}")
+
+
+def _try_claim(queue_dir, tid, worker_id, lease_seconds):
+    """Claim pending/<id> for this worker and return the claim info, or None
+    if another worker got it. Only one worker succeeds.
+
+    The marker is first renamed to a private claim file (the atomic step),
+    rewritten with the claim info, which also sets its mtime to now, and then
+    renamed to leases/<id>. If the claim file is reclaimed in between, the
+    claim is abandoned."""
+    claim = _claim_path(queue_dir, tid, worker_id)
+    try:
+        os.rename(_path(queue_dir, "pending", tid), claim)
+    except FileNotFoundError:
+        return None
+    try:
+        info = _update_info(claim, lambda info: info.update(
+            worker=worker_id, lease_seconds=lease_seconds, claimed=time.time(),
+            attempts=info.get("attempts", 0) + 1))
+        os.rename(claim, _path(queue_dir, "leases", tid))
+    except FileNotFoundError:
+        return None
+    return info
+
+
+def _parse_info(text):
+    """Claim info from a marker, lease or claim file. Empty (fresh marker) or
+    half-written files count as {}."""
+    try:
+        return json.loads(text) if text else {}
+    except ValueError:
+        return {}
+
+
+def _update_info(path, update):
+    """Rewrite the claim info of a marker, lease or claim file in place.
+    Returns the new info."""
+    with open(path, "r+") as fh:
+        info = _parse_info(fh.read())
+        update(info)
+        fh.seek(0)
+        fh.truncate()
+        fh.write(json.dumps(info))
+    return info
+
+
+def _give_up(queue_dir, tid, src, error):
+    """Move src (pending marker, lease or claim file of tid) to failed/<id>,
+    recording error. Returns False if another worker moved it first."""
+    dst = _path(queue_dir, "failed", tid)
+    try:
+        os.rename(src, dst)
+    except FileNotFoundError:
+        return False
+    _update_info(dst, lambda info: info.update(error=error, failed=time.time()))
+    return True
+
+
+def _task_failed(queue_dir, tid, error, max_attempts):
+    """Record a run that raised. The lease goes back to pending, or to failed/
+    once it has had max_attempts. Returns True if the task was given up on."""
+    lease = _path(queue_dir, "leases", tid)
+    try:
+        info = _update_info(lease, lambda info: info.update(error=error))
+    except FileNotFoundError:
+        return False
+    if info.get("attempts", 1) >= max_attempts:
+        return _give_up(queue_dir, tid, lease, error)
+    with contextlib.suppress(FileNotFoundError):
+        os.rename(lease, _path(queue_dir, "pending", tid))
+    return False
+
+
+def _renew_lease(queue_dir, tid):
+    try:
+        os.utime(_path(queue_dir, "leases", tid))
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _release(queue_dir, tid):
+    try:
+        os.remove(_path(queue_dir, "leases", tid))
+    except FileNotFoundError:
+        pass
+
+
+def reclaim_expired(queue_dir, lease_seconds=DEFAULT_LEASE_SECONDS,
+                    max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Move expired leases back to pending, or to failed/ if they have had
+    max_attempts. Returns the reclaimed task ids."""
+    now = time.time()
+    reclaimed = []
+    for name in os.listdir(_path(queue_dir, "leases")):
+        if name.endswith(_CLAIM_SUFFIX):
+            # A claimer died between its two renames; task ids contain no dots.
+            tid = name[1:].split(".", 1)[0]
+        elif name.startswith("."):
+            continue
+        else:
+            tid = name
+        lease = _path(queue_dir, "leases", name)
+        try:
+            age = now - os.stat(lease).st_mtime
+        except FileNotFoundError:
+            continue
+        if age <= lease_seconds:
+            continue
+        if _has_result(queue_dir, tid):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(lease)
+            continue
+        try:
+            with open(lease) as fh:
+                text = fh.read()
+        except FileNotFoundError:
+            continue
+        attempts = _parse_info(text).get("attempts", 0)
+        if attempts >= max_attempts:
+            _give_up(queue_dir, tid, lease, f"lease expired after {attempts} attempt(s)")
+            continue
+        try:
+            os.rename(lease, _path(queue_dir, "pending", tid))
+        except FileNotFoundError:
+            continue
+        reclaimed.append(tid)
+    return reclaimed
+
+
+class _LeaseHeartbeat:
+    """Touches a lease file periodically while its task runs."""
+
+    def __init__(self, queue_dir, tid, interval):
+        self._queue_dir = queue_dir
+        self._tid = tid
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            if not _renew_lease(self._queue_dir, self._tid):
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+# ─── Running tasks ───────────────────────────────────────────────────────────
+
+def _apply_config(config):
+    saved = {key: getattr(conditions, key) for key in config}
+    for key, value in config.items():
+        setattr(conditions, key, tuple(value) if isinstance(value, list) else value)
+    return saved
+
+
+def run_task(task, evo_budget=None):
+    """Run one task in this process and return its result record."""
+    cond, seed = task["condition"], task["seed"]
+    prefix = f"[{cond.upper()}]"
+    saved = _apply_config(task["config"])
+    start = time.time()
+    try:
+        result = {"task": task}
+        if cond == "evo":
+            train, transfer, steps = conditions.run_evo(seed, progress_prefix=prefix)
+            result["total_steps"] = steps
+        elif cond == "opt":
+            train, transfer = conditions.run_opt(seed, evo_budget, progress_prefix=prefix)
+            result["evo_budget"] = evo_budget
+        else:
+            train, transfer = conditions.run_rnd(seed, progress_prefix=prefix)
+        result["train_metrics"] = train
+        result["transfer_metrics"] = transfer
+    finally:
+        _apply_config(saved)
+    result["elapsed"] = time.time() - start
+    return result
+
+
+def _ready(queue_dir, task):
+    dep = task.get("budget_from")
+    return dep is None or _has_result(queue_dir, dep)
+
+
+def _evo_budget(queue_dir, task):
+    dep = task.get("budget_from")
+    return _load_result(queue_dir, dep)["total_steps"] if dep else None
+
+
+def work(queue_dir, worker_id=None, lease_seconds=DEFAULT_LEASE_SECONDS,
+         poll_seconds=DEFAULT_POLL_SECONDS, max_tasks=None,
+         max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Claim and run tasks until the queue is drained. Returns tasks completed.
+
+    A task that raises is retried (by any worker) until it has had
+    max_attempts, then moved to failed/ with its traceback."""
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    _init_queue(queue_dir)  # queues published before failed/ existed
+    completed = 0
+
+    while max_tasks is None or completed < max_tasks:
+        reclaim_expired(queue_dir, lease_seconds, max_attempts)
+        pending = _drop_stale_markers(queue_dir, sorted(
+            t for t in os.listdir(_path(queue_dir, "pending")) if not t.startswith(".")))
+        claimed = None
+        for tid in pending:
+            task = _load_task(queue_dir, tid)
+            dep = task.get("budget_from")
+            if dep and _has_failed(queue_dir, dep):
+                _give_up(queue_dir, tid, _path(queue_dir, "pending", tid),
+                         f"dependency {dep} failed")
+                continue
+            if not _ready(queue_dir, task):
+                continue
+            info = _try_claim(queue_dir, tid, worker_id, lease_seconds)
+            if info is not None:
+                claimed = task
+                break
+
+        if claimed is None:
+            if not pending and not _active_leases(queue_dir):
+                break
+            time.sleep(poll_seconds)
+            continue
+
+        tid = claimed["id"]
+        if _has_result(queue_dir, tid):
+            _release(queue_dir, tid)
+            continue
+
+        print(f"  [{worker_id}] Running {tid} (attempt {info['attempts']}/{max_attempts})")
+        try:
+            with _LeaseHeartbeat(queue_dir, tid, lease_seconds / 3.0):
+                result = run_task(claimed, _evo_budget(queue_dir, claimed))
+        except Exception as exc:
+            gave_up = _task_failed(queue_dir, tid, traceback.format_exc(), max_attempts)
+            print(f"  [{worker_id}] {tid} failed: {exc!r}"
+                  + (" (giving up)" if gave_up else ""))
+            continue
+        result["worker"] = worker_id
+        _atomic_write_bytes(_path(queue_dir, "results", f"{tid}.pkl"), pickle.dumps(result))
+        _release(queue_dir, tid)
+        completed += 1
+
+    return completed
+
+
+def _drop_stale_markers(queue_dir, pending):
+    """Remove pending markers of tasks that already have a result (reclaimed
+    after their lease expired, but the original worker still finished).
+    Returns the remaining task ids."""
+    remaining = []
+    for tid in pending:
+        if _has_result(queue_dir, tid):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(_path(queue_dir, "pending", tid))
+        else:
+            remaining.append(tid)
+    return remaining
+
+
+def _active_leases(queue_dir):
+    return [t for t in os.listdir(_path(queue_dir, "leases")) if not t.startswith(".")]
+
+
+def _local_worker(queue_dir, worker_id, lease_seconds, poll_seconds, max_attempts):
+    work(queue_dir, worker_id, lease_seconds, poll_seconds, max_attempts=max_attempts)
+
+
+def run_local_workers(queue_dir, n_workers, lease_seconds=DEFAULT_LEASE_SECONDS,
+                      poll_seconds=1.0, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Drain the queue with n local worker processes standing in for nodes."""
+    import multiprocessing as mp
+
+    procs = []
+    for k in range(n_workers):
+        p = mp.Process(target=_local_worker,
+                       args=(queue_dir, f"local-{k}", lease_seconds, poll_seconds,
+                             max_attempts))
+        p.start()
+        procs.append(p)
+    for p in procs:
+        p.join()
+    return [p.exitcode for p in procs]
+
+
+# ─── Status and merging ──────────────────────────────────────────────────────
+
+def queue_status(queue_dir):
+    tasks = [f[:-5] for f in os.listdir(_path(queue_dir, "tasks")) if f.endswith(".json")]
+    done = sum(1 for t in tasks if _has_result(queue_dir, t))
+    failed = sum(1 for t in tasks if _has_failed(queue_dir, t) and not _has_result(queue_dir, t))
+    leased = len(_active_leases(queue_dir))
+    return {
+        "tasks": len(tasks),
+        "done": done,
+        "failed": failed,
+        "leased": leased,
+        "pending": len(tasks) - done - failed - leased,
+    }
+
+
+def merge_results(queue_dir):
+    """Collect finished results per condition, ordered by seed.
+    Raises RuntimeError if any published task has no result yet."""
+    tids = sorted(f[:-5] for f in os.listdir(_path(queue_dir, "tasks")) if f.endswith(".json"))
+    missing = [t for t in tids if not _has_result(queue_dir, t)]
+    failed = [t for t in missing if _has_failed(queue_dir, t)]
+    if failed:
+        raise RuntimeError(f"{len(failed)} task(s) failed, e.g. {failed[0]} "
+                           f"(see {_path(queue_dir, 'failed', failed[0])})")
+    if missing:
+        raise RuntimeError(f"{len(missing)} task(s) unfinished, e.g. {missing[0]}")
+
+    merged = {cond: [] for cond in CONDITIONS}
+    for tid in tids:
+        result = _load_result(queue_dir, tid)
+        merged[result["task"]["condition"]].append(result)
+    for results in merged.values():
+        results.sort(key=lambda r: r["task"]["seed"])
+    return merged
+
+
+def merged_runs(merged):
+    """Reshape merge_results output for raw_data.write_raw_csvs."""
+    return {cond: [(r["task"]["seed"], r["train_metrics"], r["transfer_metrics"])
+                   for r in results]
+            for cond, results in merged.items()}
+
+
+def store_merged(merged, results_dir):
+    """Append merge_results output to the results store. Returns its path."""
+    from experiment.results_store import StoreWriter, config_label, store_path
+
+    root = store_path(results_dir)
+    with StoreWriter(root) as writer:
+        for cond, results in merged.items():
+            for r in results:
+                writer.append_run(cond, r["task"]["seed"], r["train_metrics"],
+                                  r["transfer_metrics"], config=config_label(r["task"]["config"]))
+    return root
+
+
+# ─── CLI ─────────────────────────────────────────────────────────────────────
+
+def _parse_config(items):
+    config = {}
+    for item in items or []:
+        key, _, value = item.partition("=")
+        config[key] = json.loads(value)
+    return config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m experiment.distributed")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("publish", help="publish (condition, seed) tasks")
+    p.add_argument("queue")
+    p.add_argument("--seeds", type=int, default=30)
+    p.add_argument("--first-seed", type=int, default=0)
+    p.add_argument("--conditions", nargs="+", default=list(CONDITIONS), choices=CONDITIONS)
+    p.add_argument("--set", action="append", metavar="NAME=JSON",
+                   help="override a setting in experiment.conditions")
+
+    for name in ("work", "local"):
+        p = sub.add_parser(name, help="run a worker" if name == "work" else
+                           "run several local worker processes")
+        p.add_argument("queue")
+        p.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS)
+        p.add_argument("--poll", type=float, default=DEFAULT_POLL_SECONDS)
+        p.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                       help="runs of a failing task before it is moved to failed/")
+        if name == "work":
+            p.add_argument("--worker-id")
+        else:
+            p.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+
+    p = sub.add_parser("status", help="summarise queue progress")
+    p.add_argument("queue")
+
+    p = sub.add_parser("merge", help="merge results into <condition>_raw.csv")
+    p.add_argument("queue")
+    p.add_argument("out_dir")
+    p.add_argument("--store", action="store_true",
+                   help="also append them to <out_dir>/store, labelled by task config")
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "publish":
+        seeds = range(args.first_seed, args.first_seed + args.seeds)
+        ids = publish_tasks(args.queue, seeds, args.conditions, _parse_config(args.set))
+        print(f"Published {len(ids)} tasks to {args.queue}")
+    elif args.cmd == "work":
+        n = work(args.queue, args.worker_id, args.lease, args.poll,
+                 max_attempts=args.max_attempts)
+        print(f"Worker finished {n} tasks")
+    elif args.cmd == "local":
+        codes = run_local_workers(args.queue, args.workers, args.lease, args.poll,
+                                  args.max_attempts)
+        return max(codes, default=0)
+    elif args.cmd == "status":
+        print(json.dumps(queue_status(args.queue), indent=2))
+    else:
+        merged = merge_results(args.queue)
+        for path in write_raw_csvs(merged_runs(merged), args.out_dir):
+            print(f"Wrote {path}")
+        if args.store:
+            path = store_merged(merged, args.out_dir)
+            print(f"Appended to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
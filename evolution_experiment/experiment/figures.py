@@ -0,0 +1,279 @@
+"""
+Publication figures (PNG + PDF) from the raw results.
+
+The pipeline has two stages:
+  1. Aggregation. Per-condition × per-generation means and 95% CIs of every
+     plotted metric, plus the transfer summary, are computed once from the
+     raw CSVs. They are cached in <results>/.figure_cache/ under the SHA-256
+     of the raw files' bytes and of the aggregation code, so a re-run with
+     unchanged data and code skips CSV parsing entirely.
+  2. Rendering. Each figure reads only its slice of the aggregates. A figure
+     is re-rendered only if that slice or its plotting code changed, or if
+     its outputs are missing. Figures that need rendering are drawn in
+     parallel worker processes.
+
+To add a figure, write fig_*(agg, results_dir) and register it in FIGURES
+with the aggregate metrics it reads.
+"""
+
+import hashlib
+import inspect
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from experiment import analysis
+from experiment.analysis import load_raw, seed_outcomes, summary_statistics
+from experiment.raw_data import (
+    CONDITIONS, POPULATION, MEAN_FOOD, TRAIT_MEANS, TRAIT_SDS, raw_path,
+)
+
+COLORS = {"evo": "#2a9d8f", "opt": "#e76f51", "rnd": "#8d99ae"}
+LABELS = {"evo": "EVO", "opt": "OPT", "rnd": "RND"}
+TRAIT_LABELS = {"speed": "Speed", "size": "Size", "sense_range": "Sense range"}
+
+CACHE_DIR = ".figure_cache"
+TIMELINE_METRICS = (POPULATION, MEAN_FOOD) + tuple(TRAIT_MEANS.values()) + tuple(TRAIT_SDS.values())
+TRANSFER_SUMMARY = "transfer_summary"
+
+
+# ─── Aggregation ─────────────────────────────────────────────────────────────
+
+def _timeline(raw):
+    """Add a continuous `t` axis: training generations, then transfer."""
+    raw = raw.copy()
+    train = raw["phase"] == "train"
+    n_train = int(raw.loc[train, "generation"].max()) + 1 if train.any() else 0
+    raw["t"] = raw["generation"] + np.where(train, 0, n_train)
+    return raw, n_train
+
+
+def generation_means(raw, metric):
+    """Per condition × t: mean and 95% normal-approximation CI across seeds."""
+    grp = raw.groupby(["condition", "t"])[metric]
+    out = grp.agg(["mean", "std", "count"]).reset_index()
+    half = 1.96 * out["std"].fillna(0.0) / np.sqrt(out["count"])
+    out["low"] = out["mean"] - half
+    out["high"] = out["mean"] + half
+    return out
+
+
+def raw_data_hash(results_dir):
+    h = hashlib.sha256()
+    for cond in CONDITIONS:
+        path = raw_path(results_dir, cond)
+        if os.path.exists(path):
+            h.update(cond.encode())
+            with open(path, "rb") as fh:
+                for chunk in iter(lambda: fh.read(1 << 20), b""):
+                    h.update(chunk)
+    return h.hexdigest()
+
+
+def compute_aggregates(raw):
+    """Everything the figures need, in one dict of small DataFrames."""
+    timeline, n_train = _timeline(raw)
+    agg = {"n_train": n_train}
+    for metric in TIMELINE_METRICS:
+        if metric in timeline:
+            agg[metric] = generation_means(timeline, metric)
+    summary = summary_statistics(seed_outcomes(raw))
+    agg[TRANSFER_SUMMARY] = summary[summary["phase"] == "transfer"].reset_index(drop=True)
+    return agg
+
+
+# Code whose changes must invalidate cached aggregates.
+_AGGREGATION_CODE = (_timeline, generation_means, compute_aggregates,
+                     seed_outcomes, summary_statistics, analysis._ci)
+
+
+def aggregates_key(results_dir):
+    """Cache key of the aggregates: the raw data plus the aggregation code."""
+    h = hashlib.sha256(raw_data_hash(results_dir).encode())
+    for code in _AGGREGATION_CODE:
+        h.update(inspect.getsource(code).encode())
+    h.update(repr((TIMELINE_METRICS, TRANSFER_SUMMARY)).encode())
+    return h.hexdigest()
+
+
+def load_aggregates(results_dir):
+    """Cached aggregates for the current raw data and aggregation code.
+    Returns (path, aggregates)."""
+    cache_dir = os.path.join(results_dir, CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"aggregates-{aggregates_key(results_dir)[:16]}.pkl")
+    if os.path.exists(path):
+        with open(path, "rb") as fh:
+            return path, pickle.load(fh)
+
+    agg = compute_aggregates(load_raw(results_dir))
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        pickle.dump(agg, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    for name in os.listdir(cache_dir):
+        if name.startswith("aggregates-") and name.endswith(".pkl") and \
+                os.path.join(cache_dir, name) != path:
+            os.remove(os.path.join(cache_dir, name))
+    return path, agg
+
+
+# ─── Plot helpers ────────────────────────────────────────────────────────────
+
+def _save(fig, results_dir, name):
+    paths = []
+    for ext in ("png", "pdf"):
+        path = os.path.join(results_dir, f"{name}.{ext}")
+        fig.savefig(path, dpi=300, bbox_inches="tight")
+        paths.append(path)
+    plt.close(fig)
+    return paths
+
+
+def _line_panel(ax, agg, conds, n_train, ylabel):
+    for cond in conds:
+        d = agg[agg["condition"] == cond]
+        if d.empty:
+            continue
+        ax.plot(d["t"], d["mean"], color=COLORS[cond], label=LABELS[cond], lw=1.5)
+        ax.fill_between(d["t"], d["low"], d["high"], color=COLORS[cond], alpha=0.2, lw=0)
+    if n_train:
+        ax.axvline(n_train - 0.5, color="k", ls="--", lw=0.8)
+    ax.set_xlabel("Generation (training | transfer)")
+    ax.set_ylabel(ylabel)
+    ax.legend(frameon=False)
+
+
+# ─── Figures ─────────────────────────────────────────────────────────────────
+
+def fig1_population(agg, results_dir):
+    fig, ax = plt.subplots(figsize=(7, 4))
+    _line_panel(ax, agg[POPULATION], ("evo", "opt", "rnd"),
+                agg["n_train"], "Population size")
+    return _save(fig, results_dir, "fig1_population")
+
+
+def fig2_mean_food(agg, results_dir):
+    fig, ax = plt.subplots(figsize=(7, 4))
+    _line_panel(ax, agg[MEAN_FOOD], ("evo", "opt", "rnd"),
+                agg["n_train"], "Mean food per creature")
+    return _save(fig, results_dir, "fig2_mean_food")
+
+
+def fig3_trait_evolution(agg, results_dir):
+    fig, axes = plt.subplots(1, len(TRAIT_MEANS), figsize=(12, 3.5))
+    for ax, (trait, col) in zip(axes, TRAIT_MEANS.items()):
+        _line_panel(ax, agg[col], ("evo",), agg["n_train"], TRAIT_LABELS[trait])
+    fig.tight_layout()
+    return _save(fig, results_dir, "fig3_trait_evolution")
+
+
+def fig4_transfer_bars(agg, results_dir):
+    summary = agg[TRANSFER_SUMMARY]
+    fig, ax = plt.subplots(figsize=(4.5, 4))
+    for x, cond in enumerate(("evo", "opt", "rnd")):
+        row = summary[summary["condition"] == cond]
+        if row.empty:
+            continue
+        row = row.iloc[0]
+        err = [[row["mean"] - row["ci95_low"]], [row["ci95_high"] - row["mean"]]]
+        ax.bar(x, row["mean"], yerr=err, color=COLORS[cond], capsize=4)
+    ax.set_xticks(range(3))
+    ax.set_xticklabels([LABELS[c] for c in ("evo", "opt", "rnd")])
+    ax.set_ylabel("Transfer mean food per creature")
+    return _save(fig, results_dir, "fig4_transfer_bars")
+
+
+def fig5_diversity(agg, results_dir):
+    fig, axes = plt.subplots(1, len(TRAIT_SDS), figsize=(12, 3.5))
+    for ax, (trait, col) in zip(axes, TRAIT_SDS.items()):
+        _line_panel(ax, agg[col], ("evo", "opt"), agg["n_train"],
+                    f"{TRAIT_LABELS[trait]} SD")
+    fig.tight_layout()
+    return _save(fig, results_dir, "fig5_diversity")
+
+
+# name -> (function, aggregate keys it reads)
+FIGURES = {
+    "fig1_population": (fig1_population, ("n_train", POPULATION)),
+    "fig2_mean_food": (fig2_mean_food, ("n_train", MEAN_FOOD)),
+    "fig3_trait_evolution": (fig3_trait_evolution, ("n_train",) + tuple(TRAIT_MEANS.values())),
+    "fig4_transfer_bars": (fig4_transfer_bars, (TRANSFER_SUMMARY,)),
+    "fig5_diversity": (fig5_diversity, ("n_train",) + tuple(TRAIT_SDS.values())),
+}
+
+# Shared code and styling whose changes must re-render every figure.
+_SHARED_CODE = (_save, _line_panel)
+_SHARED_STYLE = (COLORS, LABELS, TRAIT_LABELS)
+
+
+# ─── Pipeline ────────────────────────────────────────────────────────────────
+
+def _figure_key(name, agg):
+    fn, keys = FIGURES[name]
+    h = hashlib.sha256()
+    for key in keys:
+        value = agg[key]
+        h.update(key.encode())
+        if isinstance(value, pd.DataFrame):
+            h.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+        else:
+            h.update(repr(value).encode())
+    for code in (fn,) + _SHARED_CODE:
+        h.update(inspect.getsource(code).encode())
+    h.update(repr(_SHARED_STYLE).encode())
+    return h.hexdigest()
+
+
+def _stamp_path(results_dir, name):
+    return os.path.join(results_dir, CACHE_DIR, f"{name}.stamp")
+
+
+def _up_to_date(results_dir, name, key):
+    outputs = [os.path.join(results_dir, f"{name}.{ext}") for ext in ("png", "pdf")]
+    if not all(os.path.exists(p) for p in outputs):
+        return False
+    try:
+        with open(_stamp_path(results_dir, name)) as fh:
+            return fh.read().strip() == key
+    except FileNotFoundError:
+        return False
+
+
+def _render(name, agg_path, results_dir, key):
+    with open(agg_path, "rb") as fh:
+        agg = pickle.load(fh)
+    paths = FIGURES[name][0](agg, results_dir)
+    with open(_stamp_path(results_dir, name), "w") as fh:
+        fh.write(key)
+    return paths
+
+
+def make_figures(results_dir, names=None, workers=None, force=False):
+    """Render figures whose inputs or code changed. Returns (written, skipped)."""
+    agg_path, agg = load_aggregates(results_dir)
+    todo, skipped = [], []
+    for name in names or FIGURES:
+        key = _figure_key(name, agg)
+        if not force and _up_to_date(results_dir, name, key):
+            skipped.append(name)
+        else:
+            todo.append((name, key))
+
+    written = []
+    if len(todo) == 1 or workers == 1:
+        for name, key in todo:
+            written.extend(_render(name, agg_path, results_dir, key))
+    elif todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render, name, agg_path, results_dir, key)
+                       for name, key in todo]
+            for fut in futures:
+                written.extend(fut.result())
+    return written, skipped
@@ -0,0 +1,281 @@
+"""
+Island-model EVO condition: K subpopulations evolving on separate stages.
+
+Each island owns a SquareStage, an RNG stream spawned from the run seed, and
+its creatures, and evolves with evo_reproduce exactly like run_evo. Every
+`migration_interval` generations, each island sends `n_migrants` randomly
+chosen survivors to its neighbours (ring or fully connected topology).
+
+Islands run in their own worker processes. Migrants are routed by the parent
+in island order and drawn from each island's own stream, so results depend
+only on (seed, n_islands, settings), not on process scheduling or on whether
+parallel=True. Island k numbers its creatures in uid namespace k + 1, so
+migrants keep uids that are unique across the whole run.
+"""
+
+import numpy as np
+from simulator.creature import reset_uids, uid_counter, uid_scope
+from simulator.precision import get_float_dtype, set_float_dtype
+from simulator.stage import SquareStage
+from simulator.simulation import Simulation, evo_reproduce
+
+from experiment import conditions
+from experiment.conditions import (
+    _make_creatures, _make_training_food_fn, _relocate_creature, _run_evo_transfer,
+)
+
+TOPOLOGIES = ("ring", "full")
+DEFAULT_MIGRATION_INTERVAL = 10
+DEFAULT_N_MIGRANTS = 2
+
+# Metrics summed across islands; every other numeric metric is averaged,
+# weighted by island population.
+_SUM_KEYS = frozenset({"population", "creature_steps", "steps", "births", "deaths"})
+_NON_METRIC_KEYS = frozenset({"generation", "island", "phase", "seed"})
+
+
+def migration_targets(k, n_islands, topology):
+    """Destinations of island k's emigrants."""
+    if n_islands < 2:
+        return []
+    if topology == "ring":
+        return [(k + 1) % n_islands]
+    if topology == "full":
+        return [j for j in range(n_islands) if j != k]
+    raise ValueError(f"Unknown topology: {topology!r}")
+
+
+# ─── Island ──────────────────────────────────────────────────────────────────
+
+class Island:
+    """One subpopulation with its own stage and RNG stream."""
+
+    def __init__(self, index, seed_seq, n_creatures, stage_size, n_food):
+        self.index = index
+        self.rng = np.random.default_rng(seed_seq)
+        # Namespace 0 is the main run's (transfer phase).
+        self.uids = uid_counter(index + 1)
+        self.stage = SquareStage(stage_size)
+        self.food_fn = _make_training_food_fn(stage_size, n_food)
+        with uid_scope(self.uids):
+            self.creatures = _make_creatures(n_creatures, self.stage, self.rng)
+        self.generations_run = 0
+
+    def run_epoch(self, n_generations, targets, n_migrants):
+        """Evolve for n_generations, then pick emigrants for each target.
+        Returns (metrics, steps, {target: [creatures]})."""
+        if not self.creatures:
+            # Extinct island: stays empty unless immigrants arrive.
+            self.generations_run += n_generations
+            return [], 0, {}
+
+        sim = Simulation(self.stage, self.rng)
+        with uid_scope(self.uids):
+            metrics, survivors, steps = sim.run(
+                self.creatures, n_generations, evo_reproduce, self.food_fn,
+                phase_label="train")
+
+        for m in metrics:
+            m["island"] = self.index
+            if "generation" in m:
+                m["generation"] += self.generations_run
+        self.generations_run += n_generations
+
+        survivors = list(survivors)
+        emigrants = {}
+        for target in targets:
+            k = min(n_migrants, len(survivors))
+            if k == 0:
+                break
+            picks = sorted(self.rng.choice(len(survivors), size=k, replace=False),
+                           reverse=True)
+            emigrants[target] = [survivors.pop(i) for i in picks]
+        self.creatures = survivors
+        return metrics, steps, emigrants
+
+    def receive(self, immigrants):
+        self.creatures.extend(
+            _relocate_creature(c, self.stage, self.rng) for c in immigrants)
+        return len(self.creatures)
+
+    def survivors(self):
+        return self.creatures
+
+
+def _island_worker(conn, args, settings, dtype):
+    # Settings and engine precision chosen in the parent (e.g. distributed
+    # --set, simulate --dtype) also hold here when the process was spawned
+    # rather than forked.
+    for key, value in settings.items():
+        setattr(conditions, key, value)
+    set_float_dtype(dtype)
+    island = Island(*args)
+    while True:
+        cmd, payload = conn.recv()
+        if cmd == "epoch":
+            conn.send(island.run_epoch(*payload))
+        elif cmd == "receive":
+            conn.send(island.receive(payload))
+        elif cmd == "survivors":
+            conn.send(island.survivors())
+        else:
+            conn.close()
+            return
+
+
+class _RemoteIsland:
+    """Proxy that drives an Island living in a child process."""
+
+    def __init__(self, ctx, args, settings):
+        self._conn, child = ctx.Pipe()
+        self._proc = ctx.Process(target=_island_worker,
+                                 args=(child, args, settings, get_float_dtype()),
+                                 daemon=True)
+        self._proc.start()
+        child.close()
+
+    def submit(self, cmd, payload=None):
+        self._conn.send((cmd, payload))
+
+    def result(self):
+        return self._conn.recv()
+
+    def close(self):
+        self._conn.send(("close", None))
+        self._proc.join()
+
+
+class _LocalIsland:
+    """Same submit/result interface as _RemoteIsland, evaluated in-process."""
+
+    def __init__(self, args):
+        self._island = Island(*args)
+        self._pending = None
+
+    def submit(self, cmd, payload=None):
+        if cmd == "epoch":
+            self._pending = self._island.run_epoch(*payload)
+        elif cmd == "receive":
+            self._pending = self._island.receive(payload)
+        else:
+            self._pending = self._island.survivors()
+
+    def result(self):
+        return self._pending
+
+    def close(self):
+        pass
+
+
+# ─── Metrics ─────────────────────────────────────────────────────────────────
+
+def aggregate_island_metrics(island_metrics):
+    """Combine per-island metrics into one row per generation.
+    Counts in _SUM_KEYS are summed; other numeric metrics are averaged with
+    population weights (an approximation for spread metrics such as SDs)."""
+    by_gen = {}
+    for m in island_metrics:
+        by_gen.setdefault(m.get("generation"), []).append(m)
+
+    rows = []
+    for g in sorted(by_gen, key=lambda x: (x is None, x)):
+        group = by_gen[g]
+        weights = np.array([float(m.get("population", 1.0)) for m in group])
+        total_w = weights.sum()
+        row = {"generation": g, "n_islands": len(group)}
+        for key in group[0]:
+            if key in _NON_METRIC_KEYS:
+                continue
+            values = [m.get(key) for m in group]
+            if not all(isinstance(v, (int, float, np.number)) for v in values):
+                continue
+            values = np.asarray(values, dtype=float)
+            if key in _SUM_KEYS:
+                row[key] = float(values.sum())
+            elif total_w > 0:
+                row[key] = float(np.dot(values, weights) / total_w)
+            else:
+                row[key] = float(values.mean())
+        rows.append(row)
+    return rows
+
+
+# ─── EVO island condition ────────────────────────────────────────────────────
+
+def run_evo_islands(seed, n_islands=4, migration_interval=DEFAULT_MIGRATION_INTERVAL,
+                    n_migrants=DEFAULT_N_MIGRANTS, topology="ring",
+                    n_per_island=None, parallel=True,
+                    progress_prefix="[EVO-ISL]"):
+    """Run the EVO condition as an island model.
+
+    Training evolves n_islands populations of n_per_island (default
+    N_CREATURES) creatures for TRAIN_GENERATIONS, exchanging migrants every
+    migration_interval generations. All island survivors are pooled into the
+    usual EVO transfer phase. Settings are read from experiment.conditions
+    when called.
+
+    Returns (island_metrics, train_metrics, transfer_metrics, total_creature_steps)
+    where island_metrics has one row per island × generation and
+    train_metrics is their per-generation aggregate."""
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown topology: {topology!r}")
+    if migration_interval < 1:
+        raise ValueError("migration_interval must be >= 1")
+
+    reset_uids()
+    seq = np.random.SeedSequence(seed)
+    island_seqs = seq.spawn(n_islands)
+    rng = np.random.default_rng(seq.spawn(1)[0])
+
+    # Settings are read at call time, so overrides made after import apply.
+    n_generations = conditions.TRAIN_GENERATIONS
+    if n_per_island is None:
+        n_per_island = conditions.N_CREATURES
+    island_args = [(k, island_seqs[k], n_per_island, conditions.TRAIN_STAGE_SIZE,
+                    conditions.TRAIN_FOOD)
+                   for k in range(n_islands)]
+    if parallel and n_islands > 1:
+        import multiprocessing as mp
+        ctx = mp.get_context()
+        settings = {k: v for k, v in vars(conditions).items() if k.isupper()}
+        islands = [_RemoteIsland(ctx, args, settings) for args in island_args]
+    else:
+        islands = [_LocalIsland(args) for args in island_args]
+
+    island_metrics = []
+    total_steps = 0
+    try:
+        done = 0
+        while done < n_generations:
+            n_gens = min(migration_interval, n_generations - done)
+            for k, isl in enumerate(islands):
+                isl.submit("epoch", (n_gens, migration_targets(k, n_islands, topology),
+                                     n_migrants))
+            inboxes = [[] for _ in range(n_islands)]
+            for isl in islands:
+                metrics, steps, emigrants = isl.result()
+                island_metrics.extend(metrics)
+                total_steps += steps
+                for target in sorted(emigrants):
+                    inboxes[target].extend(emigrants[target])
+            done += n_gens
+
+            for k, isl in enumerate(islands):
+                isl.submit("receive", inboxes[k])
+            sizes = [isl.result() for isl in islands]
+            print(f"  {progress_prefix} Seed {seed}, Train Gen {done}/{n_generations}, "
+                  f"island sizes {sizes}")
+
+        survivors = []
+        for isl in islands:
+            isl.submit("survivors")
+            survivors.extend(isl.result())
+    finally:
+        for isl in islands:
+            isl.close()
+
+    transfer_metrics, transfer_steps = _run_evo_transfer(
+        survivors, rng, seed, progress_prefix)
+
+    train_metrics = aggregate_island_metrics(island_metrics)
+    return island_metrics, train_metrics, transfer_metrics, total_steps + transfer_steps
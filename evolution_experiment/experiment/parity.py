@@ -0,0 +1,133 @@
+"""
+Parity report for the single-precision engine mode.
+
+Runs the same seeds under float64 and float32 and quantifies how far the
+trajectories diverge. Individual runs are chaotic: once one comparison flips,
+the RNG streams desynchronise. So the report gives both per-run differences
+(including the first generation at which each seed diverged) and ensemble
+differences between the seed-averaged outcomes. The ensemble numbers decide
+whether float32 is usable.
+
+Usage:
+    python -m experiment.parity --seeds 10 --condition evo --tolerance 0.05
+"""
+
+import argparse
+import csv
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from experiment.raw_data import POPULATION, MEAN_FOOD, TRAIT_MEANS
+
+PARITY_METRICS = (POPULATION, MEAN_FOOD) + tuple(TRAIT_MEANS.values())
+DEFAULT_TOLERANCE = 0.05
+
+
+def _run(condition, seed, dtype):
+    from experiment import conditions
+    from simulator.precision import float_precision
+
+    with float_precision(dtype):
+        if condition == "evo":
+            train, transfer, steps = conditions.run_evo(seed, progress_prefix=f"[EVO {dtype}]")
+        elif condition == "rnd":
+            train, transfer = conditions.run_rnd(seed, progress_prefix=f"[RND {dtype}]")
+        else:
+            raise ValueError(f"Parity runs support evo and rnd, not {condition!r}")
+    return {"train": train, "transfer": transfer}
+
+
+def _series(metrics, metric):
+    return np.array([m.get(metric, np.nan) for m in metrics], dtype=np.float64)
+
+
+def _first_divergence(a_metrics, b_metrics):
+    for g, (a, b) in enumerate(zip(a_metrics, b_metrics)):
+        if any(a.get(k) != b.get(k) for k in PARITY_METRICS):
+            return g
+    return -1 if len(a_metrics) == len(b_metrics) else min(len(a_metrics), len(b_metrics))
+
+
+def compare(runs64, runs32, tolerance=DEFAULT_TOLERANCE):
+    """Build report rows from paired {phase: metrics} runs, one pair per seed."""
+    rows = []
+    for phase in ("train", "transfer"):
+        divergence = [_first_divergence(a[phase], b[phase]) for a, b in zip(runs64, runs32)]
+        for metric in PARITY_METRICS:
+            abs_diffs = []
+            seed64, seed32 = [], []
+            for a, b in zip(runs64, runs32):
+                sa, sb = _series(a[phase], metric), _series(b[phase], metric)
+                n = min(len(sa), len(sb))
+                abs_diffs.append(np.abs(sa[:n] - sb[:n]))
+                seed64.append(np.nanmean(sa) if len(sa) else np.nan)
+                seed32.append(np.nanmean(sb) if len(sb) else np.nan)
+            diffs = np.concatenate(abs_diffs) if abs_diffs else np.array([])
+            seed64, seed32 = np.array(seed64), np.array(seed32)
+            m64, m32 = float(np.nanmean(seed64)), float(np.nanmean(seed32))
+            se = math.sqrt(np.nanvar(seed64, ddof=1) / len(seed64)
+                           + np.nanvar(seed32, ddof=1) / len(seed32)) if len(seed64) > 1 else np.nan
+            rel = float(abs(m32 - m64) / abs(m64)) if m64 else np.nan
+            rows.append({
+                "phase": phase, "metric": metric, "n_seeds": len(seed64),
+                "mean_float64": m64, "mean_float32": m32,
+                "rel_diff_of_means": rel,
+                "ensemble_z": float((m32 - m64) / se) if se else np.nan,
+                "mean_abs_diff": float(np.nanmean(diffs)) if diffs.size else np.nan,
+                "max_abs_diff": float(np.nanmax(diffs)) if diffs.size else np.nan,
+                "identical_seeds": sum(d == -1 for d in divergence),
+                "median_first_divergence": float(np.median([d for d in divergence if d >= 0]))
+                if any(d >= 0 for d in divergence) else np.nan,
+                "within_tolerance": bool(rel <= tolerance),
+            })
+    return rows
+
+
+def run_parity(seeds, condition="evo", tolerance=DEFAULT_TOLERANCE, workers=None):
+    """Run every seed under both precisions (in parallel) and compare them."""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        f64 = [pool.submit(_run, condition, s, "float64") for s in seeds]
+        f32 = [pool.submit(_run, condition, s, "float32") for s in seeds]
+        runs64 = [f.result() for f in f64]
+        runs32 = [f.result() for f in f32]
+    return compare(runs64, runs32, tolerance)
+
+
+def write_report(rows, path):
+    with open(path, "w", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m experiment.parity")
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--condition", default="evo", choices=["evo", "rnd"])
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="max relative difference of seed-averaged metrics")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--results-dir", default="results")
+    args = parser.parse_args(argv)
+
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    rows = run_parity(seeds, args.condition, args.tolerance, args.workers)
+    os.makedirs(args.results_dir, exist_ok=True)
+    path = write_report(rows, os.path.join(args.results_dir, "precision_parity.csv"))
+    for r in rows:
+        flag = "ok  " if r["within_tolerance"] else "FAIL"
+        print(f"  {flag} {r['phase']:<8} {r['metric']:<18} "
+              f"f64={r['mean_float64']:.4f} f32={r['mean_float32']:.4f} "
+              f"rel={r['rel_diff_of_means']:.2%} z={r['ensemble_z']:.2f}")
+    print(f"Wrote {path}")
+    return 0 if all(r["within_tolerance"] for r in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Raw per-generation results: <condition>_raw.csv files.
+
+Uses only the standard library so that simulation workers and the `status`
+command never pay for pandas. One row per seed × phase × generation; the
+remaining columns are the metric dicts returned by Simulation.run.
+"""
+
+import csv
+import os
+
+CONDITIONS = ("evo", "opt", "rnd")
+PHASES = ("train", "transfer")
+
+# Metric columns used by the analysis and figures.
+POPULATION = "population"
+MEAN_FOOD = "mean_food"
+TRAIT_MEANS = {"speed": "mean_speed", "size": "mean_size", "sense_range": "mean_sense_range"}
+TRAIT_SDS = {"speed": "sd_speed", "size": "sd_size", "sense_range": "sd_sense_range"}
+
+
+def raw_path(results_dir, condition):
+    return os.path.join(results_dir, f"{condition}_raw.csv")
+
+
+def metric_rows(seed, train_metrics, transfer_metrics):
+    """Flatten one seed's metrics into raw CSV rows."""
+    rows = []
+    for phase, metrics in (("train", train_metrics), ("transfer", transfer_metrics)):
+        for m in metrics:
+            row = {"seed": seed, "phase": phase}
+            row.update(m)
+            rows.append(row)
+    return rows
+
+
+def write_raw_csv(path, rows):
+    fields = list(dict.fromkeys(k for row in rows for k in row))
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, path)
+    return path
+
+
+def write_raw_csvs(runs, results_dir):
+    """runs maps condition -> list of (seed, train_metrics, transfer_metrics).
+    Returns the written paths."""
+    os.makedirs(results_dir, exist_ok=True)
+    paths = []
+    for cond, seed_runs in runs.items():
+        if not seed_runs:
+            continue
+        rows = []
+        for seed, train, transfer in sorted(seed_runs, key=lambda r: r[0]):
+            rows.extend(metric_rows(seed, train, transfer))
+        paths.append(write_raw_csv(raw_path(results_dir, cond), rows))
+    return paths
+
+
+def events_path(results_dir, condition):
+    return os.path.join(results_dir, f"{condition}_events.csv")
+
+
+def write_events_csv(path, logs):
+    """Write eat/kill events next to the raw metrics.
+
+    logs is an iterable of (seed, phase, generation, EventLog); each log's
+    rows are prefixed with those three keys. kind is written by name
+    ("food" or "creature")."""
+    from simulator.events import KIND_NAMES
+
+    fields = ["seed", "phase", "generation",
+              "step", "eater_uid", "kind", "victim_uid", "x", "y"]
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(fields)
+        for seed, phase, generation, log in logs:
+            cols = {k: v.tolist() for k, v in log.columns().items()}
+            cols["kind"] = [KIND_NAMES[k] for k in cols["kind"]]
+            for row in zip(*(cols[k] for k in fields[3:])):
+                writer.writerow((seed, phase, generation) + row)
+    os.replace(tmp, path)
+    return path
+
+
+def lineage_path(results_dir, condition, seed):
+    """Binary lineage store of one run (see simulator/lineage.py)."""
+    return os.path.join(results_dir, "lineage", f"{condition}_seed{seed}.bin")
+
+
+def read_raw_csv(path):
+    """Read a raw CSV into a list of dicts (values left as strings)."""
+    with open(path, newline="") as fh:
+        return list(csv.DictReader(fh))
+
+
+def seeds_in(path):
+    return sorted({int(row["seed"]) for row in read_raw_csv(path)})
@@ -0,0 +1,390 @@
+"""
+Memory-mapped cross-seed results store.
+
+The raw CSVs have to be parsed in full by every analysis. The store keeps
+the same per-generation metrics as typed binary column files instead, and
+reads them back with np.memmap, so loading a sweep costs no parsing at all.
+Every row is keyed by (condition, config, seed, phase, generation). `config`
+is a free-form label for the settings the run used (e.g. a distributed
+queue's overrides, see config_label), so one store can hold a whole sweep.
+
+Layout:
+    <results>/store/<segment>/meta.json      columns, dtypes, committed rows
+    <results>/store/<segment>/<column>.bin   one little-endian array per column
+
+Each writer appends to its own segment, named after its start time, host
+and pid, so concurrent writers (processes or nodes on a shared filesystem)
+never touch the same files. An append first writes the column files and
+then replaces meta.json atomically with the new row count. Readers only
+trust meta.json, so a half-written append (e.g. a crash) is invisible.
+
+Reading:
+    store = ResultsStore("results/store")
+    cols = store.columns(["seed", "generation", "mean_food"], condition="evo")
+    store.to_frame()                  # load_raw-style DataFrame
+    store.export_csvs("results")      # back to <condition>_raw.csv
+
+Columns of a single segment are zero-copy memmap slices. Reads spanning
+several segments concatenate them; compact() merges all segments into one.
+If the same key was written more than once, the most recent segment wins.
+
+Uses only NumPy and the standard library (pandas only for to_frame), so
+simulation workers can append without importing pandas.
+"""
+
+import json
+import os
+import shutil
+import socket
+import time
+import uuid
+
+import numpy as np
+
+from experiment.raw_data import CONDITIONS, PHASES, metric_rows, raw_path, write_raw_csv
+
+STORE_DIR = "store"
+DEFAULT_CONFIG = "default"
+KEY_COLUMNS = ("condition", "config", "seed", "phase", "generation")
+_KEY_DTYPES = {"condition": "<i1", "config": "<i4", "seed": "<i8",
+               "phase": "<i1", "generation": "<i4"}
+_METRIC_DTYPE = "<f8"
+
+
+def store_path(results_dir):
+    return os.path.join(results_dir, STORE_DIR)
+
+
+def config_label(config):
+    """Store label of a settings override dict (e.g. a distributed task's config)."""
+    return json.dumps(config, sort_keys=True) if config else DEFAULT_CONFIG
+
+
+def _write_meta(seg_dir, meta):
+    tmp = os.path.join(seg_dir, f".meta.{os.getpid()}.tmp")
+    with open(tmp, "w") as fh:
+        json.dump(meta, fh)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, os.path.join(seg_dir, "meta.json"))
+
+
+# ─── Writing ─────────────────────────────────────────────────────────────────
+
+class StoreWriter:
+    """Appender owning one new segment of a store."""
+
+    def __init__(self, root):
+        os.makedirs(root, exist_ok=True)
+        name = f"{time.time_ns():020d}-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.dir = os.path.join(root, name)
+        os.mkdir(self.dir)
+        # metrics: column name -> True while every value written was an int,
+        # so export can reproduce the CSV formatting.
+        self.meta = {"n_rows": 0, "configs": [], "metrics": {}}
+        _write_meta(self.dir, self.meta)
+
+    def append_rows(self, condition, config, rows):
+        """Append raw_data-style rows (dicts with seed, phase, generation and
+        metrics) of one condition and config."""
+        if not rows:
+            return
+        configs = self.meta["configs"]
+        if config not in configs:
+            configs.append(config)
+        metrics = self.meta["metrics"]
+        for row in rows:
+            for key, value in row.items():
+                if key in ("seed", "phase", "generation"):
+                    continue
+                is_int = isinstance(value, (int, np.integer)) and not isinstance(value, bool)
+                if key not in metrics:
+                    self._backfill(key)
+                    metrics[key] = is_int
+                elif not is_int:
+                    metrics[key] = False
+
+        n = len(rows)
+        columns = {
+            "condition": np.full(n, CONDITIONS.index(condition), dtype=_KEY_DTYPES["condition"]),
+            "config": np.full(n, configs.index(config), dtype=_KEY_DTYPES["config"]),
+            "seed": np.array([r["seed"] for r in rows], dtype=_KEY_DTYPES["seed"]),
+            "phase": np.array([PHASES.index(r["phase"]) for r in rows], dtype=_KEY_DTYPES["phase"]),
+            "generation": np.array([r["generation"] for r in rows], dtype=_KEY_DTYPES["generation"]),
+        }
+        for key in metrics:
+            columns[key] = np.array([r.get(key, np.nan) for r in rows], dtype=_METRIC_DTYPE)
+
+        for key, values in columns.items():
+            with open(os.path.join(self.dir, f"{key}.bin"), "ab") as fh:
+                fh.write(values.tobytes())
+                fh.flush()
+                os.fsync(fh.fileno())
+        self.meta["n_rows"] += n
+        _write_meta(self.dir, self.meta)
+
+    def _backfill(self, key):
+        """Start a metric column that earlier appends did not have (NaN rows)."""
+        with open(os.path.join(self.dir, f"{key}.bin"), "wb") as fh:
+            fh.write(np.full(self.meta["n_rows"], np.nan, dtype=_METRIC_DTYPE).tobytes())
+
+    def append_run(self, condition, seed, train_metrics, transfer_metrics,
+                   config=DEFAULT_CONFIG):
+        """Append one seed's metrics, as returned by conditions.run_*."""
+        self.append_rows(condition, config, metric_rows(seed, train_metrics, transfer_metrics))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+# ─── Reading ─────────────────────────────────────────────────────────────────
+
+class _Segment:
+    def __init__(self, seg_dir, meta):
+        self.dir = seg_dir
+        self.n_rows = meta["n_rows"]
+        self.configs = meta["configs"]
+        self.metrics = meta["metrics"]
+
+    def column(self, name):
+        """Zero-copy view of the committed rows of a column (None if absent)."""
+        if name in _KEY_DTYPES:
+            dtype = _KEY_DTYPES[name]
+        elif name in self.metrics:
+            dtype = _METRIC_DTYPE
+        else:
+            return None
+        if self.n_rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.dir, f"{name}.bin"), dtype=dtype,
+                         mode="r", shape=(self.n_rows,))
+
+
+class ResultsStore:
+    """Read side of a store directory (see the module docstring)."""
+
+    def __init__(self, root):
+        self.root = root
+        self.segments = []
+        self.refresh()
+
+    def refresh(self):
+        """Pick up segments and rows committed since the store was opened."""
+        segments = []
+        names = sorted(os.listdir(self.root)) if os.path.isdir(self.root) else []
+        for name in names:
+            seg_dir = os.path.join(self.root, name)
+            try:
+                with open(os.path.join(seg_dir, "meta.json")) as fh:
+                    meta = json.load(fh)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            if meta["n_rows"]:
+                segments.append(_Segment(seg_dir, meta))
+        self.segments = segments
+        return self
+
+    def __len__(self):
+        return sum(s.n_rows for s in self.segments)
+
+    @property
+    def configs(self):
+        return sorted({c for s in self.segments for c in s.configs})
+
+    @property
+    def metrics(self):
+        return list(dict.fromkeys(m for s in self.segments for m in s.metrics))
+
+    def _int_metrics(self):
+        return {m for m in self.metrics
+                if all(s.metrics.get(m, True) for s in self.segments)}
+
+    def _selection(self, seg, condition, config, phase, seeds):
+        """Row selector of seg for the filters: a slice when no filter
+        applies (so columns stay zero-copy), else an index array, or None if
+        no row can match."""
+        mask = None
+
+        def narrow(m):
+            return m if mask is None else mask & m
+
+        if condition is not None:
+            mask = narrow(seg.column("condition") == CONDITIONS.index(condition))
+        if config is not None:
+            if config not in seg.configs:
+                return None
+            mask = narrow(seg.column("config") == seg.configs.index(config))
+        if phase is not None:
+            mask = narrow(seg.column("phase") == PHASES.index(phase))
+        if seeds is not None:
+            mask = narrow(np.isin(seg.column("seed"), np.asarray(seeds)))
+        return slice(None) if mask is None else np.flatnonzero(mask)
+
+    def columns(self, names=None, condition=None, config=None, phase=None, seeds=None):
+        """Dict of column arrays for the rows matching the filters. Key
+        columns come back as stored codes (see decode()). Metrics a segment
+        lacks are NaN."""
+        names = list(names or KEY_COLUMNS + tuple(self.metrics))
+        parts = {name: [] for name in names}
+        for seg in self.segments:
+            sel = self._selection(seg, condition, config, phase, seeds)
+            if sel is None:
+                continue
+            n = seg.n_rows if isinstance(sel, slice) else len(sel)
+            if n == 0:
+                continue
+            for name in names:
+                col = seg.column(name)
+                if name == "config":
+                    # Per-segment codes -> codes into self.configs.
+                    remap = np.array([self.configs.index(c) for c in seg.configs],
+                                     dtype=_KEY_DTYPES["config"])
+                    col = remap[col[sel]]
+                elif col is None:
+                    col = np.full(n, np.nan)
+                else:
+                    col = col[sel]
+                parts[name].append(col)
+        out = {}
+        for name, chunks in parts.items():
+            if len(chunks) == 1:
+                out[name] = chunks[0]
+            elif chunks:
+                out[name] = np.concatenate(chunks)
+            else:
+                out[name] = np.empty(0, dtype=_KEY_DTYPES.get(name, _METRIC_DTYPE))
+        return out
+
+    def _latest(self, cols):
+        """Index of the rows to keep: rows in key order, the last write per key."""
+        keys = [cols[k] for k in reversed(KEY_COLUMNS)]
+        order = np.lexsort(keys)
+        n = len(order)
+        if n == 0:
+            return order
+        superseded = np.zeros(n, dtype=bool)
+        superseded[:-1] = True
+        for k in keys:
+            s = k[order]
+            superseded[:-1] &= s[1:] == s[:-1]
+        # lexsort is stable, so the last of equal keys is the latest write.
+        return order[~superseded]
+
+    def decode(self, cols):
+        """Replace condition, config and phase codes with their names."""
+        out = dict(cols)
+        if "condition" in out:
+            out["condition"] = np.asarray(CONDITIONS, dtype=object)[out["condition"]]
+        if "config" in out:
+            out["config"] = np.asarray(self.configs, dtype=object)[out["config"]]
+        if "phase" in out:
+            out["phase"] = np.asarray(PHASES, dtype=object)[out["phase"]]
+        return out
+
+    def to_frame(self, config=None, **filters):
+        """Rows as a DataFrame in the layout of analysis.load_raw (plus
+        `config` when not filtering on one), one row per key, in key order."""
+        import pandas as pd
+
+        cols = self.columns(config=config, **filters)
+        keep = self._latest(cols)
+        cols = self.decode({k: v[keep] for k, v in cols.items()})
+        if config is not None:
+            del cols["config"]
+        frame = pd.DataFrame(cols)
+        for name in ("seed", "generation"):
+            frame[name] = frame[name].astype(np.int64)
+        for name in self._int_metrics():
+            if name in frame and not frame[name].isna().any():
+                frame[name] = frame[name].astype(np.int64)
+        return frame
+
+    # --- Maintenance ---
+
+    def export_csvs(self, results_dir, config=DEFAULT_CONFIG):
+        """Write one config's rows back to <condition>_raw.csv. Returns the paths."""
+        ints = self._int_metrics()
+        metrics = self.metrics
+        paths = []
+        for cond in CONDITIONS:
+            cols = self.columns(condition=cond, config=config)
+            keep = self._latest(cols)
+            if len(keep) == 0:
+                continue
+            seed = cols["seed"][keep].tolist()
+            phase = [PHASES[p] for p in cols["phase"][keep].tolist()]
+            generation = cols["generation"][keep].tolist()
+            values = {m: cols[m][keep].tolist() for m in metrics}
+            rows = []
+            for i in range(len(keep)):
+                row = {"seed": seed[i], "phase": phase[i], "generation": generation[i]}
+                for m in metrics:
+                    v = values[m][i]
+                    if v == v:
+                        row[m] = int(v) if m in ints else v
+                rows.append(row)
+            os.makedirs(results_dir, exist_ok=True)
+            paths.append(write_raw_csv(raw_path(results_dir, cond), rows))
+        return paths
+
+    def compact(self):
+        """Merge all segments into one, keeping only the latest row per key.
+        Run it while no writer is appending."""
+        old = list(self.segments)
+        if len(old) <= 1:
+            return self
+        cols = self.columns()
+        keep = self._latest(cols)
+        cols = self.decode({k: v[keep] for k, v in cols.items()})
+        ints = self._int_metrics()
+        metrics = self.metrics
+
+        writer = StoreWriter(self.root)
+        for config in self.configs:
+            for cond in CONDITIONS:
+                sel = np.flatnonzero((cols["config"] == config) & (cols["condition"] == cond))
+                if len(sel) == 0:
+                    continue
+                rows = []
+                for i in sel.tolist():
+                    row = {"seed": int(cols["seed"][i]), "phase": cols["phase"][i],
+                           "generation": int(cols["generation"][i])}
+                    for m in metrics:
+                        v = float(cols[m][i])
+                        row[m] = int(v) if m in ints and v == v else v
+                    rows.append(row)
+                writer.append_rows(cond, config, rows)
+        for seg in old:
+            shutil.rmtree(seg.dir)
+        return self.refresh()
+
+
+def import_csvs(results_dir, root=None, config=DEFAULT_CONFIG):
+    """Append the <condition>_raw.csv files of results_dir to a store."""
+    from experiment.raw_data import read_raw_csv
+
+    n = 0
+    with StoreWriter(root or store_path(results_dir)) as writer:
+        for cond in CONDITIONS:
+            path = raw_path(results_dir, cond)
+            if not os.path.exists(path):
+                continue
+            rows = []
+            for row in read_raw_csv(path):
+                parsed = {"seed": int(row.pop("seed")), "phase": row.pop("phase"),
+                          "generation": int(row.pop("generation"))}
+                for key, value in row.items():
+                    if value == "":
+                        parsed[key] = float("nan")
+                    else:
+                        try:
+                            parsed[key] = int(value)
+                        except ValueError:
+                            parsed[key] = float(value)
+                rows.append(parsed)
+            writer.append_rows(cond, config, rows)
+            n += len(rows)
+    return n
@@ -0,0 +1,250 @@
+"""
+Sequential-stopping seed scheduler with streaming cross-seed statistics.
+
+Seeds are added in batches. Each finished seed is folded into running
+(Welford) estimates of its condition's per-phase outcome (mean food per
+creature averaged over the phase, as in experiment.analysis). After every
+batch, a condition stops once the 95% CI half-width of every tracked phase is
+at most the target, or once it reaches max_seeds.
+
+Sequential design: with K = 1 + ceil((max_seeds - min_seeds) / batch_size)
+possible looks, each look uses a t-interval at level 1 - alpha / K
+(Bonferroni alpha spending). By the union bound, the intervals from all
+looks hold simultaneously with probability at least 1 - alpha. The interval
+reported at the stopping look therefore keeps its nominal coverage even
+though the sample size was chosen from the data. This is conservative but
+needs no assumption beyond the usual approximately normal seed outcomes.
+
+The stopping report is followed by Welch's t-test and Cohen's d between
+every pair of conditions (seed_schedule_tests.csv), with the CI on the mean
+difference at the same sequential level. The p-values are the usual
+fixed-sample ones and do not account for the data-dependent seed counts.
+
+Running:
+    python -m experiment.cli sequential --ci-half-width 0.05
+"""
+
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from experiment.raw_data import PHASES, MEAN_FOOD, write_raw_csvs
+
+DEFAULT_ALPHA = 0.05
+DEFAULT_BATCH_SIZE = 5
+DEFAULT_MIN_SEEDS = 5
+DEFAULT_MAX_SEEDS = 30
+
+
+class RunningStats:
+    """Welford's streaming mean and variance."""
+
+    __slots__ = ('n', 'mean', '_m2')
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (x - self.mean)
+
+    @property
+    def var(self):
+        return self._m2 / (self.n - 1) if self.n > 1 else float("nan")
+
+    def half_width(self, level):
+        """t-interval half-width at the given confidence level."""
+        if self.n < 2:
+            return float("inf")
+        from scipy import stats
+        return stats.t.ppf(0.5 + level / 2.0, self.n - 1) * math.sqrt(self.var / self.n)
+
+
+def n_looks(min_seeds, max_seeds, batch_size):
+    return 1 + max(0, math.ceil((max_seeds - min_seeds) / batch_size))
+
+
+def look_level(alpha, looks):
+    """Per-look confidence level under Bonferroni alpha spending."""
+    return 1.0 - alpha / looks
+
+
+def seed_outcome(metrics, metric=MEAN_FOOD):
+    values = [m[metric] for m in metrics if metric in m]
+    return float(np.mean(values)) if values else float("nan")
+
+
+# ─── Running seeds ───────────────────────────────────────────────────────────
+
+def _run_seed(cond, seed, evo_budget, opt_search):
+    from experiment import conditions
+
+    if cond == "evo":
+        train, transfer, steps = conditions.run_evo(seed)
+        return cond, seed, train, transfer, steps
+    if cond == "opt":
+        train, transfer = conditions.run_opt(seed, evo_budget, search=opt_search)
+    else:
+        train, transfer = conditions.run_rnd(seed)
+    return cond, seed, train, transfer, None
+
+
+class _ConditionState:
+    def __init__(self, phases):
+        self.stats = {phase: RunningStats() for phase in phases}
+        self.seeds = []
+        self.stopped = None
+
+    def add(self, seed, train, transfer):
+        self.seeds.append(seed)
+        for phase, metrics in (("train", train), ("transfer", transfer)):
+            if phase in self.stats:
+                self.stats[phase].add(seed_outcome(metrics))
+
+
+def run_sequential(conds=("evo", "opt", "rnd"), target_half_width=0.05,
+                   phases=PHASES, alpha=DEFAULT_ALPHA, batch_size=DEFAULT_BATCH_SIZE,
+                   min_seeds=DEFAULT_MIN_SEEDS, max_seeds=DEFAULT_MAX_SEEDS,
+                   first_seed=0, workers=None, opt_search="hill"):
+    """Run seed batches until every condition reaches the target precision.
+
+    Returns (report, runs). report has one row per condition × phase with the
+    seeds used, the stopping reason, the estimate and its sequential CI. runs
+    maps condition -> [(seed, train_metrics, transfer_metrics)] for
+    raw_data.write_raw_csvs. EVO is still run for budget when only OPT is
+    continuing, but those extra EVO seeds are not added to EVO's estimate."""
+    looks = n_looks(min_seeds, max_seeds, batch_size)
+    level = look_level(alpha, looks)
+    states = {cond: _ConditionState(phases) for cond in conds}
+    runs = {cond: [] for cond in conds}
+    next_seed = first_seed
+    batch = min_seeds
+    look = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while any(s.stopped is None for s in states.values()):
+            look += 1
+            active = [c for c in conds if states[c].stopped is None]
+            # Active conditions have run every seed so far; never exceed max_seeds.
+            batch = max(1, min(batch, max_seeds - (next_seed - first_seed)))
+            seeds = range(next_seed, next_seed + batch)
+            next_seed += batch
+            batch = batch_size
+            print(f"  [SEQ] Look {look}/{looks}: seeds {seeds.start}-{seeds.stop - 1} "
+                  f"for {', '.join(c.upper() for c in active)}")
+
+            pending = set()
+            for seed in seeds:
+                if "evo" in active or "opt" in active:
+                    pending.add(pool.submit(_run_seed, "evo", seed, None, opt_search))
+                if "rnd" in active:
+                    pending.add(pool.submit(_run_seed, "rnd", seed, None, opt_search))
+
+            while pending:
+                fut = next(as_completed(pending))
+                pending.remove(fut)
+                cond, seed, train, transfer, steps = fut.result()
+                if cond == "evo" and "opt" in active:
+                    pending.add(pool.submit(_run_seed, "opt", seed, steps, opt_search))
+                if cond not in active:
+                    continue
+                runs[cond].append((seed, train, transfer))
+                state = states[cond]
+                state.add(seed, train, transfer)
+                est = ", ".join(f"{p}={st.mean:.3f}±{st.half_width(level):.3f}"
+                                for p, st in state.stats.items())
+                print(f"  [SEQ] {cond.upper()} seed {seed} done (n={len(state.seeds)}): {est}")
+
+            for cond in active:
+                state = states[cond]
+                if all(st.half_width(level) <= target_half_width
+                       for st in state.stats.values()):
+                    state.stopped = "precision"
+                elif len(state.seeds) >= max_seeds:
+                    state.stopped = "max_seeds"
+                if state.stopped:
+                    print(f"  [SEQ] {cond.upper()} stopped after {len(state.seeds)} "
+                          f"seeds ({state.stopped})")
+
+    report = []
+    for cond in conds:
+        state = states[cond]
+        for phase, st in state.stats.items():
+            hw = st.half_width(level)
+            report.append({
+                "condition": cond, "phase": phase, "n_seeds": st.n,
+                "stopped": state.stopped, "mean": st.mean,
+                "sd": math.sqrt(st.var) if st.n > 1 else float("nan"),
+                "ci_level": level, "ci_low": st.mean - hw, "ci_high": st.mean + hw,
+                "target_half_width": target_half_width, "looks": look,
+            })
+    return report, runs
+
+
+def compare_conditions(runs, level, phases=PHASES):
+    """Welch's t-test and Cohen's d for every pair of conditions in runs (as
+    returned by run_sequential), per phase, on the seed outcomes. Rows follow
+    statistical_tests.csv plus n_a, n_b and ci_level; the CI on the mean
+    difference is at `level`."""
+    from experiment.analysis import welch_comparison
+
+    rows = []
+    for phase in phases:
+        k = 1 + PHASES.index(phase)
+        outcomes = {cond: [seed_outcome(run[k]) for run in cond_runs]
+                    for cond, cond_runs in runs.items()}
+        for a, b in itertools.combinations(runs, 2):
+            if len(outcomes[a]) < 2 or len(outcomes[b]) < 2:
+                continue
+            rows.append({"phase": phase, "comparison": f"{a.upper()} vs {b.upper()}",
+                         "n_a": len(outcomes[a]), "n_b": len(outcomes[b]),
+                         "ci_level": level,
+                         **welch_comparison(outcomes[a], outcomes[b], level)})
+    return rows
+
+
+def write_schedule_report(report, results_dir):
+    return _write_rows(os.path.join(results_dir, "seed_schedule.csv"), report)
+
+
+def write_comparison_report(comparisons, results_dir):
+    return _write_rows(os.path.join(results_dir, "seed_schedule_tests.csv"), comparisons)
+
+
+def _write_rows(path, report):
+    import csv
+
+    with open(path, "w", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(report[0]))
+        writer.writeheader()
+        writer.writerows(report)
+    return path
+
+
+def run_and_save(results_dir, **kwargs):
+    start = time.time()
+    report, runs = run_sequential(**kwargs)
+    paths = write_raw_csvs(runs, results_dir)
+    paths.append(write_schedule_report(report, results_dir))
+    for row in report:
+        print(f"  [SEQ] {row['condition'].upper()} {row['phase']}: n={row['n_seeds']} "
+              f"({row['stopped']}), mean={row['mean']:.3f} "
+              f"[{row['ci_low']:.3f}, {row['ci_high']:.3f}]")
+    phases = tuple(dict.fromkeys(row["phase"] for row in report))
+    comparisons = compare_conditions(runs, report[0]["ci_level"], phases)
+    if comparisons:
+        paths.append(write_comparison_report(comparisons, results_dir))
+    for row in comparisons:
+        print(f"  [SEQ] {row['comparison']} {row['phase']}: "
+              f"diff={row['mean_diff']:.3f} [{row['ci95_low']:.3f}, {row['ci95_high']:.3f}], "
+              f"p={row['p']:.3g}, d={row['cohens_d']:.2f}")
+    print(f"  [SEQ] Done in {time.time() - start:.1f}s")
+    return paths
@@ -0,0 +1,90 @@
+"""
+Gaussian-process surrogate for the OPT condition's trait search.
+
+A small NumPy-only GP regressor (RBF kernel plus a noise term) over
+(speed, size, sense) scaled to the unit cube. It is only meant for the few
+hundred noisy evaluations a search budget affords: it refits from scratch
+and picks the length scale on a small grid by marginal likelihood.
+"""
+
+import math
+import numpy as np
+
+LENGTH_SCALES = (0.05, 0.1, 0.2, 0.4, 0.8)
+NOISE = 0.1           # noise variance relative to the standardised signal
+_JITTER = 1e-9
+
+_erf = np.frompyfunc(math.erf, 1, 1)
+
+
+def _norm_cdf(z):
+    return 0.5 * (1.0 + _erf(z / math.sqrt(2.0)).astype(np.float64))
+
+
+def _norm_pdf(z):
+    return np.exp(-0.5 * z * z) / math.sqrt(2.0 * math.pi)
+
+
+def _sq_dists(a, b):
+    d = a[:, np.newaxis, :] - b[np.newaxis, :, :]
+    return np.sum(d * d, axis=2)
+
+
+class GaussianProcess:
+    """GP regression on points scaled to [0, 1]^d by the given bounds."""
+
+    def __init__(self, bounds, noise=NOISE, length_scales=LENGTH_SCALES):
+        bounds = np.asarray(bounds, dtype=np.float64)
+        self.lo = bounds[:, 0]
+        self.span = bounds[:, 1] - bounds[:, 0]
+        self.noise = noise
+        self.length_scales = length_scales
+        self.length_scale = None
+
+    def _scale(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.lo) / self.span
+
+    def fit(self, X, y):
+        self._X = self._scale(X)
+        y = np.asarray(y, dtype=np.float64)
+        self._y_mean = y.mean()
+        self._y_sd = y.std() or 1.0
+        z = (y - self._y_mean) / self._y_sd
+        sq = _sq_dists(self._X, self._X)
+        n = len(z)
+
+        best = None
+        for ls in self.length_scales:
+            K = np.exp(-0.5 * sq / (ls * ls)) + (self.noise + _JITTER) * np.eye(n)
+            try:
+                L = np.linalg.cholesky(K)
+            except np.linalg.LinAlgError:
+                continue
+            alpha = np.linalg.solve(L.T, np.linalg.solve(L, z))
+            log_ml = -0.5 * z @ alpha - np.log(np.diag(L)).sum()
+            if best is None or log_ml > best[0]:
+                best = (log_ml, ls, L, alpha)
+        if best is None:
+            raise np.linalg.LinAlgError("GP kernel matrix is not positive definite")
+        _, self.length_scale, self._L, self._alpha = best
+        return self
+
+    def predict(self, X):
+        """Posterior mean and standard deviation in the original score units."""
+        Xs = self._scale(X)
+        ls = self.length_scale
+        Ks = np.exp(-0.5 * _sq_dists(Xs, self._X) / (ls * ls))
+        mean = Ks @ self._alpha
+        v = np.linalg.solve(self._L, Ks.T)
+        var = np.maximum(1.0 - np.sum(v * v, axis=0), 0.0)
+        return self._y_mean + self._y_sd * mean, self._y_sd * np.sqrt(var)
+
+
+def expected_improvement(mean, sd, best, xi=0.01):
+    """EI of maximising over `best`; zero where the posterior is certain."""
+    sd = np.asarray(sd, dtype=np.float64)
+    imp = np.asarray(mean, dtype=np.float64) - best - xi
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(sd > 0, imp / sd, 0.0)
+    ei = imp * _norm_cdf(z) + sd * _norm_pdf(z)
+    return np.where(sd > 0, ei, 0.0)
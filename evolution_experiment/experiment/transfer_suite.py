@@ -0,0 +1,315 @@
+"""
+Transfer suite: many transfer environments branched from one training run.
+
+Training is most of the compute per seed, so each condition × seed is
+trained once. The end of training is captured in a TrainingSnapshot: EVO's
+survivors, OPT's best configuration and the RNG state. Snapshots are
+pickled under <results>/snapshots/, keyed by the experiment settings in
+effect (and OPT's search strategy), so later suites with other environments
+skip training altogether. Every snapshot × environment pair then runs as an
+independent task in a process pool.
+
+RNG streams:
+  - "baseline" (conditions.transfer_env()) resumes the snapshot's own RNG, so
+    its rows equal the transfer phase of run_evo/run_opt/run_rnd.
+  - Every other environment gets a stream derived from (seed, environment
+    name). It does not depend on the condition or on which other environments
+    are in the suite, so conditions see common random numbers per seed.
+
+OPT's creature-step budget is EVO's training plus baseline transfer steps, as
+in run_opt. Its snapshot is therefore taken once EVO's baseline transfer
+for the same seed has finished.
+
+Running:
+    python -m experiment.cli transfer-suite --seeds 30
+writes transfer_suite.csv (one row per condition × environment × seed ×
+generation) and transfer_suite_summary.csv.
+"""
+
+import csv
+import hashlib
+import os
+import pickle
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+from experiment import conditions
+from experiment.conditions import BASELINE_ENV
+from experiment.raw_data import CONDITIONS, write_raw_csv
+from experiment.sequential import RunningStats, seed_outcome
+
+# Each environment is a name plus overrides of conditions.transfer_env(),
+# resolved when the suite runs so that TRANSFER_* setting overrides apply.
+TRANSFER_SUITE = (
+    dict(name=BASELINE_ENV),
+    dict(name="uniform", n_clusters=0),
+    dict(name="small_stage", stage_size=200),
+    dict(name="large_stage", stage_size=500),
+    dict(name="scarce_food", n_food=12),
+    dict(name="rich_food", n_food=50),
+    dict(name="two_patches", n_clusters=2),
+    dict(name="many_patches", n_clusters=12),
+    dict(name="tight_patches", cluster_sd=10.0),
+    dict(name="diffuse_patches", cluster_sd=60.0),
+)
+BASELINE = BASELINE_ENV
+SNAPSHOT_DIR = "snapshots"
+_PREFIX = {"evo": "[EVO]", "opt": "[OPT]", "rnd": "[RND]"}
+
+
+# ─── Snapshots ───────────────────────────────────────────────────────────────
+
+class TrainingSnapshot:
+    """End-of-training state of one condition × seed."""
+
+    def __init__(self, condition, seed, train_metrics, rng_state, train_steps=None,
+                 survivors=None, best=None, opt_search=None):
+        self.condition = condition
+        self.seed = seed
+        self.opt_search = opt_search  # OPT only
+        self.train_metrics = train_metrics
+        self.rng_state = rng_state
+        self.train_steps = train_steps
+        self.survivors = survivors  # EVO: trait records, see _creature_record
+        self.best = best            # OPT: (speed, size, sense)
+
+    def rng(self):
+        """A generator positioned where training left off."""
+        rng = np.random.default_rng()
+        rng.bit_generator.state = self.rng_state
+        return rng
+
+
+def _creature_record(c):
+    return dict(speed=c.speed, size=c.size, sense_range=c.sense_range_trait,
+                reach=c.reach_trait, flee_distance=c.flee_distance,
+                life_span=c.life_span, energy=c.energy, age=c.age)
+
+
+def _creatures_from_records(records):
+    from simulator.creature import Creature
+
+    return [Creature(pos=(0.0, 0.0), **rec) for rec in records]
+
+
+def settings_hash():
+    """Short hash of the experiment settings in effect (the upper-case
+    constants of experiment.conditions, including any overrides)."""
+    items = sorted((k, repr(v)) for k, v in vars(conditions).items() if k.isupper())
+    return hashlib.sha256(repr(items).encode()).hexdigest()[:12]
+
+
+def snapshot_path(results_dir, condition, seed, opt_search="hill"):
+    """Snapshots are keyed by the settings in effect and, for OPT, the search
+    strategy, so a run with other settings never reuses them."""
+    search = f"_{opt_search}" if condition == "opt" else ""
+    return os.path.join(results_dir, SNAPSHOT_DIR,
+                        f"{condition}_seed{seed}{search}_{settings_hash()}.pkl")
+
+
+def save_snapshot(snap, results_dir):
+    path = snapshot_path(results_dir, snap.condition, snap.seed, snap.opt_search)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        pickle.dump(snap, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return path
+
+
+def load_snapshot(results_dir, condition, seed, opt_search="hill"):
+    """The saved snapshot for the current settings, or None."""
+    try:
+        with open(snapshot_path(results_dir, condition, seed, opt_search), "rb") as fh:
+            return pickle.load(fh)
+    except FileNotFoundError:
+        return None
+
+
+def take_snapshot(condition, seed, evo_budget=None, opt_search="hill"):
+    """Run one condition's training phase and capture its end state."""
+    prefix = _PREFIX[condition]
+    if condition == "evo":
+        train, survivors, steps, rng = conditions.train_evo(seed, prefix)
+        return TrainingSnapshot("evo", seed, train, rng.bit_generator.state, steps,
+                                survivors=[_creature_record(c) for c in survivors])
+    if condition == "opt":
+        train, best, rng = conditions.train_opt(seed, evo_budget, prefix, opt_search)
+        return TrainingSnapshot("opt", seed, train, rng.bit_generator.state, best=best,
+                                opt_search=opt_search)
+    if condition == "rnd":
+        train, rng = conditions.train_rnd(seed, prefix)
+        return TrainingSnapshot("rnd", seed, train, rng.bit_generator.state)
+    raise ValueError(f"Unknown condition: {condition!r}")
+
+
+# ─── Transfer environments ───────────────────────────────────────────────────
+
+def env_rng(snap, env):
+    """The RNG stream for running env from snap (see the module docstring)."""
+    if env["name"] == BASELINE:
+        return snap.rng()
+    return np.random.default_rng(
+        np.random.SeedSequence([snap.seed, zlib.crc32(env["name"].encode())]))
+
+
+def run_transfer(snap, env):
+    """Run one transfer environment from a snapshot.
+    Returns (transfer_metrics, transfer_steps)."""
+    from simulator.creature import reset_uids
+
+    rng = env_rng(snap, env)
+    reset_uids()
+    prefix = _PREFIX[snap.condition]
+    if env["name"] != BASELINE:
+        prefix = f"{prefix[:-1]} {env['name']}]"
+    if snap.condition == "evo":
+        survivors = _creatures_from_records(snap.survivors)
+        return conditions._run_evo_transfer(survivors, rng, snap.seed, prefix, env)
+    if snap.condition == "opt":
+        return conditions._run_opt_transfer(snap.best, rng, snap.seed, prefix, env)
+    return conditions._run_rnd_transfer(rng, snap.seed, prefix, env)
+
+
+# ─── Worker tasks ────────────────────────────────────────────────────────────
+
+def _snapshot_task(results_dir, condition, seed, evo_budget, opt_search):
+    snap = take_snapshot(condition, seed, evo_budget, opt_search)
+    save_snapshot(snap, results_dir)
+    return "snapshot", snap
+
+
+def _transfer_task(snap, env):
+    metrics, steps = run_transfer(snap, env)
+    return "transfer", (snap.condition, snap.seed, env["name"], metrics, steps)
+
+
+def run_suite(results_dir, seeds, conds=CONDITIONS, suite=TRANSFER_SUITE,
+              workers=None, opt_search="hill", reuse_snapshots=True):
+    """Train (or load) every condition × seed once and run every environment
+    of the suite from it. EVO is trained for OPT's budget even when it is not
+    in conds; then only its baseline transfer is run.
+
+    Returns {(condition, environment, seed): transfer_metrics}."""
+    names = [spec["name"] for spec in suite]
+    if len(set(names)) != len(names):
+        raise ValueError("Transfer environment names must be unique")
+    envs = {spec["name"]: conditions.transfer_env(**spec) for spec in suite}
+    baseline = conditions.transfer_env()
+    results = {}
+    evo_train_steps = {}
+    opt_waiting = set()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+
+        def fan_out(snap):
+            if snap.condition == "evo":
+                evo_train_steps[snap.seed] = snap.train_steps
+            if snap.condition in conds:
+                targets = list(envs.values())
+                if snap.seed in opt_waiting and BASELINE not in envs:
+                    targets.append(baseline)
+            else:
+                targets = [baseline]
+            for env in targets:
+                pending.add(pool.submit(_transfer_task, snap, env))
+
+        def start(cond, seed, evo_budget=None):
+            snap = (load_snapshot(results_dir, cond, seed, opt_search)
+                    if reuse_snapshots else None)
+            if snap is None:
+                pending.add(pool.submit(_snapshot_task, results_dir, cond, seed,
+                                        evo_budget, opt_search))
+            else:
+                print(f"  [SUITE] {cond.upper()} seed {seed}: reusing snapshot")
+                fan_out(snap)
+
+        for seed in seeds:
+            if "opt" in conds:
+                snap = (load_snapshot(results_dir, "opt", seed, opt_search)
+                        if reuse_snapshots else None)
+                if snap is None:
+                    opt_waiting.add(seed)
+                else:
+                    print(f"  [SUITE] OPT seed {seed}: reusing snapshot")
+                    fan_out(snap)
+            for cond in conds:
+                if cond != "opt":
+                    start(cond, seed)
+            if seed in opt_waiting and "evo" not in conds:
+                start("evo", seed)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            pending.difference_update(done)
+            for fut in done:
+                kind, payload = fut.result()
+                if kind == "snapshot":
+                    print(f"  [SUITE] {payload.condition.upper()} seed {payload.seed}: "
+                          f"trained, branching transfer environments")
+                    fan_out(payload)
+                    continue
+
+                cond, seed, name, metrics, steps = payload
+                if cond in conds and name in envs:
+                    results[(cond, name, seed)] = metrics
+                if cond == "evo" and name == BASELINE and seed in opt_waiting:
+                    opt_waiting.discard(seed)
+                    pending.add(pool.submit(_snapshot_task, results_dir, "opt", seed,
+                                            evo_train_steps[seed] + steps, opt_search))
+
+    return results
+
+
+# ─── Output ──────────────────────────────────────────────────────────────────
+
+def suite_rows(results):
+    """Long table: one row per condition × environment × seed × generation."""
+    rows = []
+    for (cond, name, seed), metrics in sorted(results.items()):
+        for m in metrics:
+            row = {"condition": cond, "environment": name, "seed": seed}
+            row.update(m)
+            rows.append(row)
+    return rows
+
+
+def suite_summary(results, level=0.95):
+    """Per condition × environment: seed outcomes (mean food per creature over
+    the transfer phase) with a t-interval across seeds."""
+    stats = {}
+    for (cond, name, seed), metrics in sorted(results.items()):
+        stats.setdefault((name, cond), RunningStats()).add(seed_outcome(metrics))
+    rows = []
+    for (name, cond), st in stats.items():
+        hw = st.half_width(level)
+        rows.append({
+            "environment": name, "condition": cond, "n_seeds": st.n,
+            "mean": st.mean, "ci95_low": st.mean - hw, "ci95_high": st.mean + hw,
+        })
+    return rows
+
+
+def run_and_save(results_dir, seeds, **kwargs):
+    start = time.time()
+    os.makedirs(results_dir, exist_ok=True)
+    results = run_suite(results_dir, seeds, **kwargs)
+    paths = [write_raw_csv(os.path.join(results_dir, "transfer_suite.csv"), suite_rows(results))]
+
+    summary = suite_summary(results)
+    path = os.path.join(results_dir, "transfer_suite_summary.csv")
+    with open(path, "w", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(summary[0]))
+        writer.writeheader()
+        writer.writerows(summary)
+    paths.append(path)
+    for row in summary:
+        print(f"  [SUITE] {row['environment']:<16} {row['condition'].upper()}: "
+              f"n={row['n_seeds']}, mean={row['mean']:.3f} "
+              f"[{row['ci95_low']:.3f}, {row['ci95_high']:.3f}]")
+    print(f"  [SUITE] Done in {time.time() - start:.1f}s")
+    return paths
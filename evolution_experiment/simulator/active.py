@@ -0,0 +1,67 @@
+"""
+Compacted index of a generation's active creatures.
+
+Rebuilt once per step in PRE, right after the generation shuffles its
+creatures. The set keeps the shuffled relative order and each member's index
+in gen.creatures. The cannibalism pair walk uses those indices to tell whether
+a member's predecessor slot was active, which keeps its pair semantics intact.
+
+Creatures flag the set as dirty when sleep() or kill() (including exhaustion
+deaths from the energy schedule) takes them out of the ACTIVE state. The next
+members() call then drops them in O(active).
+"""
+
+from .creature import CreatureState
+
+_ACTIVE = CreatureState.ACTIVE
+
+
+class ActiveSet:
+    __slots__ = ('_members', '_index', '_stepped', 'dirty')
+
+    def __init__(self, creatures):
+        for c in creatures:
+            c._watcher = self
+        self._members = []
+        self._index = []
+        self._stepped = list(creatures)
+        self.dirty = False
+
+    def rebuild(self, creatures):
+        """Re-read the active creatures (in their current order) after a shuffle.
+        Returns the creatures that were active at the previous rebuild."""
+        stepped = self._stepped
+        self._index = [k for k, c in enumerate(creatures) if c.state == _ACTIVE]
+        self._members = [creatures[k] for k in self._index]
+        self._stepped = self._members
+        self.dirty = False
+        return stepped
+
+    def _compact(self):
+        keep = [k for k, c in enumerate(self._members) if c.state == _ACTIVE]
+        self._members = [self._members[k] for k in keep]
+        self._index = [self._index[k] for k in keep]
+        self.dirty = False
+
+    def members(self):
+        """Active creatures in generation order. Treat as read-only."""
+        if self.dirty:
+            self._compact()
+        return self._members
+
+    def indices(self):
+        """Positions of members() within gen.creatures."""
+        if self.dirty:
+            self._compact()
+        return self._index
+
+    def __len__(self):
+        return len(self.members())
+
+
+def active_set(gen):
+    """The generation's active set, created on first use."""
+    act = getattr(gen, "active", None)
+    if act is None:
+        act = gen.active = ActiveSet(gen.creatures)
+    return act
@@ -7,16 +7,29 @@ Behaviour order matches primer_behaviours() in api/mod.rs:
 
 Each phase function applies behaviours in that order, only calling into
 behaviours that are active for that phase.
+
+Per-step phases iterate the generation's ActiveSet (simulator/active.py)
+rather than all of gen.creatures, so their cost scales with the number of
+active creatures. Positions, traits and distance matrices come from the
+generation's StepGeometry (simulator/geometry.py), which run_move invalidates.
+Motion energy is accounted for by the generation's EnergySchedule
+(simulator/energy.py), which also decides exhaustion deaths.
 """
 
 import math
 import numpy as np
-from .creature import Objective, ObjectiveIntensity, _dist
+from .creature import Objective, ObjectiveIntensity, DeathCause, _dist
+from .events import event_log, EVENT_FOOD, EVENT_CREATURE, NO_VICTIM
+from .active import active_set
+from .geometry import geometry
+from .energy import energy_schedule
 
 AGE_LIMIT_VARIANCE = 1.0
 CANNIBALISM_SIZE_RATIO = 0.8
 _PI4 = math.pi / 4.0
 _NEG_PI4 = -_PI4
+_INTENSITIES = tuple(ObjectiveIntensity)
+_NO_OBJECTIVE = -1
 
 
 # ─── INIT phase ───────────────────────────────────────────────────────────────
@@ -25,27 +38,32 @@ def run_init(gen, stage, rng):
     # StarveBehaviour (INIT): kill creatures with speed == 0
     for c in gen.creatures:
         if c.get_speed() == 0.0:
-            c.kill()
+            c.kill(DeathCause.STARVED)
 
     # OldAgeBehaviour (INIT): check old age
     for c in gen.creatures:
         if c.is_alive():
             lifetime = rng.normal(c.get_life_span(), AGE_LIMIT_VARIANCE)
             if c.age > lifetime:
-                c.kill()
+                c.kill(DeathCause.OLD_AGE)
 
 
 # ─── PRE phase ────────────────────────────────────────────────────────────────
 
 def run_pre(gen, stage, rng):
-    # ResetBehaviour: reset objectives for all alive creatures
-    for c in gen.creatures:
-        if c.is_alive():
-            c.reset_objective()
+    """ResetBehaviour + EdgeHomeBehaviour for alive creatures, then rebuild the
+    active set in the freshly shuffled order.
 
-    # EdgeHomeBehaviour: set home positions via nearest edge
-    for c in gen.creatures:
+    Both behaviours are idempotent for a creature that has not moved since the
+    last PRE, so only creatures that were active during the previous step need
+    them: the rest keep the objective and home they already have."""
+    stepped = active_set(gen).rebuild(gen.creatures)
+
+    for c in stepped:
         if c.is_alive():
+            # ResetBehaviour: reset objectives
+            c.reset_objective()
+            # EdgeHomeBehaviour: set home positions via nearest edge
             c.home_pos = stage.compute_edge_home(c.pos)
 
 
@@ -63,9 +81,7 @@ def _orient_wander(gen, stage, rng):
     If target is outside stage, head toward center."""
     center = stage.get_center()
     s = stage.size
-    for c in gen.creatures:
-        if not c.is_active():
-            continue
+    for c in active_set(gen).members():
         ang = rng.uniform(_NEG_PI4, _PI4)
         direction = c.get_direction()
         cos_a = math.cos(ang)
@@ -86,40 +102,32 @@ def _orient_wander(gen, stage, rng):
 
 def _orient_cannibalism(gen, stage, rng):
     """CannibalismBehaviour ORIENT: predators chase prey, prey flee.
-    Pair iteration order matches the Rust for_pred_prey_pair method.
-    Uses precomputed pairwise distances for performance."""
-    creatures = gen.creatures
+    Pair iteration order matches the Rust for_pred_prey_pair method, walked
+    over the active set: member i only starts pairs when the slot just before
+    it in gen.creatures is active too, which is exactly when the Rust walk's
+    predecessor check passes. Uses the step geometry's pairwise distances."""
+    act = active_set(gen)
+    creatures = act.members()
+    idx = act.indices()
     N = len(creatures)
     if N < 2:
         return
 
-    positions = np.empty((N, 2))
-    sizes = np.empty(N)
-    eff_speeds = np.empty(N)
-    sense_ranges = np.empty(N)
-    flee_dists = np.empty(N)
-    active = np.empty(N, dtype=bool)
-
-    for k, c in enumerate(creatures):
-        positions[k] = c.pos
-        sizes[k] = c.get_size()
-        eff_speeds[k] = c.get_speed()
-        sense_ranges[k] = c.get_sense_range()
-        flee_dists[k] = c.flee_distance[0]
-        active[k] = c.is_active()
-
-    diffs = positions[:, np.newaxis, :] - positions[np.newaxis, :, :]
-    dist_matrix = np.sqrt(np.sum(diffs * diffs, axis=2))
+    frame = geometry(gen).frame(creatures)
+    positions = frame.pos
+    sizes = frame.size
+    eff_speeds = frame.speed
+    sense_ranges = frame.sense
+    flee_dists = frame.flee
+    dist_matrix = frame.dist()
 
     target_prey_speed = {}
 
     for i in range(1, N):
-        if not active[i]:
+        if idx[i - 1] != idx[i] - 1:
             continue
         pred_idx = i - 1
         for j in range(i, N):
-            if not active[j]:
-                continue
             pi, pj = pred_idx, j
 
             if sizes[pi] > sizes[pj]:
@@ -127,8 +135,6 @@ def _orient_cannibalism(gen, stage, rng):
             else:
                 pred_i, prey_i = pj, pi
 
-            if not active[pred_i] or not active[prey_i]:
-                continue
             if sizes[pred_i] * CANNIBALISM_SIZE_RATIO < sizes[prey_i]:
                 continue
 
@@ -161,7 +167,7 @@ def _orient_cannibalism(gen, stage, rng):
 
             target_prey_speed[pid] = prey_spd
 
-            n_eaten = len(predator.foods_eaten)
+            n_eaten = predator.n_eaten
             if n_eaten == 0:
                 intensity = ObjectiveIntensity.VitalCraving
             elif n_eaten == 1:
@@ -175,34 +181,27 @@ def _orient_cannibalism(gen, stage, rng):
 
 def _orient_scavenge(gen, stage, rng):
     """ScavengeBehaviour ORIENT: hungry creatures look for nearest visible food.
-    Uses vectorized distance matrix for performance."""
+    Uses the step geometry's creature–food distance matrix."""
     available_food = gen.get_available_food()
     if not available_food:
         return
 
-    creatures = gen.creatures
+    creatures = active_set(gen).members()
     N = len(creatures)
-    M = len(available_food)
-
-    creature_pos = np.empty((N, 2))
-    for i, c in enumerate(creatures):
-        creature_pos[i] = c.pos
-
-    food_pos = np.empty((M, 2))
-    for j, f in enumerate(available_food):
-        food_pos[j] = f.position
+    if N == 0:
+        return
 
-    diffs = creature_pos[:, np.newaxis, :] - food_pos[np.newaxis, :, :]
-    food_dists = np.sqrt(np.sum(diffs * diffs, axis=2))  # (N, M)
+    geo = geometry(gen)
+    food_dists = geo.food_dist(geo.frame(creatures), available_food)  # (N, M)
 
     nearest_idx = np.argmin(food_dists, axis=1)
     nearest_dist = food_dists[np.arange(N), nearest_idx]
 
     for i, c in enumerate(creatures):
-        if not c.is_active() or len(c.foods_eaten) >= 2:
+        if c.n_eaten >= 2:
             continue
         if nearest_dist[i] <= c.get_sense_range():
-            n_eaten = len(c.foods_eaten)
+            n_eaten = c.n_eaten
             if n_eaten == 0:
                 intensity = ObjectiveIntensity.VitalCraving
             elif n_eaten == 1:
@@ -217,62 +216,98 @@ def _orient_scavenge(gen, stage, rng):
 def _orient_satisfied(gen, stage, rng):
     """SatisfiedBehaviour ORIENT: creatures that ate >1 food head home (MajorCraving).
     Creatures with 1 food delegate to homesick logic.
-    Ported from behaviours/satisfied.rs (which calls HomesickBehaviour::how_homesick)."""
-    for c in gen.creatures:
-        if not c.is_active():
-            continue
-
-        n_eaten = len(c.foods_eaten)
-        if n_eaten == 0:
-            continue
-
-        if n_eaten > 1:
-            obj = Objective(c.home_pos.copy(), ObjectiveIntensity.MajorCraving, "satisfied")
-        else:
-            obj = _how_homesick(c)
-            if obj is None:
-                continue
-
-        c.add_objective(obj)
-        if c.can_reach(c.home_pos):
-            c.sleep()
-
-
-def _how_homesick(creature):
-    """HomesickBehaviour::how_homesick — energy-based urgency to return home.
+    Ported from behaviours/satisfied.rs (which calls HomesickBehaviour::how_homesick).
+
+    Evaluated as arrays over the fed members of the active set. Each
+    creature's decision depends only on its own state, and the float64
+    arithmetic follows the scalar code operation by operation, so objectives
+    and sleeps match the per-creature port exactly."""
+    members = active_set(gen).members()
+    rows = [k for k, c in enumerate(members) if c.n_eaten]
+    if not rows:
+        return
+    fed = [members[k] for k in rows]
+
+    frame = geometry(gen).frame(members)
+    speed = frame.column("speed")[rows]
+    cost = frame.column("cost")[rows]
+    reach = frame.column("reach")[rows]
+    pos = frame.pos[rows].astype(np.float64)
+    n_eaten, energy, consumed = np.array(
+        [(c.n_eaten, c.energy, c.energy_consumed) for c in fed], dtype=np.float64).T
+    energy_left = np.maximum(energy - consumed, 0.0)
+    home = np.array([c.home_pos for c in fed], dtype=np.float64)
+
+    dx = home[:, 0] - pos[:, 0]
+    dy = home[:, 1] - pos[:, 1]
+    dist_home = np.sqrt(dx * dx + dy * dy)
+
+    codes = np.where(n_eaten > 1, int(ObjectiveIntensity.MajorCraving),
+                     _homesick_intensity(dist_home, speed, cost, energy_left))
+    has_objective = codes != _NO_OBJECTIVE
+    sleeps = has_objective & (dist_home <= reach)
+    # Only creatures out of reach now need the swept check against their last move.
+    swept = np.flatnonzero(has_objective & ~sleeps)
+    if swept.size:
+        sleeps[swept] = _swept_reach(pos[swept], [fed[k] for k in swept.tolist()],
+                                     home[swept], reach[swept])
+
+    codes = codes.tolist()
+    for k in np.flatnonzero(has_objective).tolist():
+        c = fed[k]
+        reason = "satisfied" if c.n_eaten > 1 else "low energy"
+        c.add_objective(Objective(c.home_pos.copy(), _INTENSITIES[codes[k]], reason))
+    for k in np.flatnonzero(sleeps).tolist():
+        fed[k].sleep()
+
+
+def _homesick_intensity(dist, speed, cost, energy_left):
+    """HomesickBehaviour::how_homesick — energy-based urgency to return home,
+    for arrays of creatures. Returns ObjectiveIntensity codes, or
+    _NO_OBJECTIVE where the creature is not homesick.
     Ported from behaviours/homesick.rs."""
-    dx = float(creature.home_pos[0]) - float(creature.pos[0])
-    dy = float(creature.home_pos[1]) - float(creature.pos[1])
-    dist = math.sqrt(dx * dx + dy * dy)
-    cost = creature.get_motion_energy_cost()
-    speed = creature.get_speed()
-    if speed == 0.0:
-        return Objective(creature.home_pos.copy(), ObjectiveIntensity.VitalCraving, "low energy")
-    steps_to_home = dist / speed
-    if cost == 0.0:
-        return None
-    homesick_factor = creature.get_energy_left() / cost - steps_to_home
-
-    if homesick_factor > 10.0:
-        return None
-    elif homesick_factor > 5.0:
-        intensity = ObjectiveIntensity.MinorCraving
-    elif homesick_factor > 0.0:
-        intensity = ObjectiveIntensity.MajorCraving
-    else:
-        intensity = ObjectiveIntensity.VitalCraving
-
-    return Objective(creature.home_pos.copy(), intensity, "low energy")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        homesick_factor = energy_left / cost - dist / speed
+    codes = np.where(homesick_factor > 0.0, int(ObjectiveIntensity.MajorCraving),
+                     int(ObjectiveIntensity.VitalCraving))
+    codes[homesick_factor > 5.0] = int(ObjectiveIntensity.MinorCraving)
+    codes[(homesick_factor > 10.0) | (cost == 0.0)] = _NO_OBJECTIVE
+    codes[speed == 0.0] = int(ObjectiveIntensity.VitalCraving)
+    return codes
+
+
+def _swept_reach(pos, creatures, pt, reach):
+    """Second half of Creature.can_reach(pt) for arrays of creatures: whether
+    each one swept within reach of pt on its last move."""
+    last = [c.get_last_position() for c in creatures]
+    has_last = np.array([p is not None for p in last])
+    last = np.array([p if p is not None else c.pos for p, c in zip(last, creatures)],
+                    dtype=np.float64).reshape(len(creatures), 2)
+    r1x, r1y = pos[:, 0], pos[:, 1]
+    r2x, r2y = last[:, 0], last[:, 1]
+    px, py = pt[:, 0], pt[:, 1]
+    vx = r2x - r1x
+    vy = r2y - r1y
+    v_norm = np.sqrt(vx * vx + vy * vy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        nx = vx / v_norm
+        ny = vy / v_norm
+        pa_dot_n = (r1x - px) * nx + (r1y - py) * ny
+        pb_dot_n = (r2x - px) * nx + (r2y - py) * ny
+        diff_x = -pa_dot_n * nx - (px - r1x)
+        diff_y = -pa_dot_n * ny - (py - r1y)
+        swept = np.sqrt(diff_x * diff_x + diff_y * diff_y) <= reach
+    return swept & has_last & (v_norm != 0.0) & ~(pa_dot_n * pb_dot_n > 0.0)
 
 
 # ─── MOVE phase ──────────────────────────────────────────────────────────────
 
 def run_move(gen, stage, rng):
-    """BasicMoveBehaviour: move each active creature one step."""
+    """BasicMoveBehaviour: move each active creature one step. Motion costs
+    are accounted for by the energy schedule, which reports who ran out."""
     s = stage.size
-    for c in gen.creatures:
-        if not c.is_active():
-            continue
+    schedule = energy_schedule(gen)
+    for c in active_set(gen).members():
         d = c.get_direction()
         spd = c.get_speed()
         nx = float(c.pos[0]) + spd * float(d[0])
@@ -286,6 +321,9 @@ def run_move(gen, stage, rng):
         elif ny > s:
             ny = s
         c.move_to(np.array([nx, ny]))
+    for c in schedule.advance():
+        c.kill(DeathCause.EXHAUSTED)
+    geometry(gen).invalidate()
 
 
 # ─── ACT phase ───────────────────────────────────────────────────────────────
@@ -297,28 +335,23 @@ def run_act(gen, stage, rng):
 
 def _act_cannibalism(gen):
     """CannibalismBehaviour ACT: predators eat prey they can reach.
-    Same pair iteration order as ORIENT. Precomputes distances."""
-    creatures = gen.creatures
+    Same pair iteration order as ORIENT. Uses the step geometry's distances."""
+    act = active_set(gen)
+    creatures = act.members()
+    idx = act.indices()
     N = len(creatures)
     if N < 2:
         return
 
-    positions = np.empty((N, 2))
-    sizes = np.empty(N)
-    reaches = np.empty(N)
-    active = np.empty(N, dtype=bool)
-
-    for k, c in enumerate(creatures):
-        positions[k] = c.pos
-        sizes[k] = c.get_size()
-        reaches[k] = c.get_reach()
-        active[k] = c.is_active()
-
-    diffs = positions[:, np.newaxis, :] - positions[np.newaxis, :, :]
-    dist_matrix = np.sqrt(np.sum(diffs * diffs, axis=2))
+    frame = geometry(gen).frame(creatures)
+    sizes = frame.size
+    reaches = frame.reach
+    dist_matrix = frame.dist()
+    active = np.ones(N, dtype=bool)
+    log = event_log(gen)
 
     for i in range(1, N):
-        if not active[i]:
+        if not active[i] or idx[i - 1] != idx[i] - 1:
             continue
         pred_idx = i - 1
         for j in range(i, N):
@@ -338,13 +371,11 @@ def _act_cannibalism(gen):
             predator = creatures[pred_i]
             prey = creatures[prey_i]
 
-            if dist_matrix[pred_i, prey_i] <= reaches[pred_i]:
-                predator.eat_food(gen.steps, "creature")
-                prey.kill()
-                active[prey_i] = False
-            elif predator.can_reach(prey.pos):
-                predator.eat_food(gen.steps, "creature")
-                prey.kill()
+            if (dist_matrix[pred_i, prey_i] <= reaches[pred_i]
+                    or predator.can_reach(prey.pos)):
+                predator.eat_food()
+                log.record(gen.steps, predator.uid, EVENT_CREATURE, prey.uid, prey.pos)
+                prey.kill(DeathCause.EATEN)
                 active[prey_i] = False
 
 
@@ -355,24 +386,20 @@ def _act_scavenge(gen):
     if not available_food:
         return
 
-    creatures = gen.creatures
+    creatures = active_set(gen).members()
     N = len(creatures)
+    if N == 0:
+        return
     M = len(available_food)
 
-    creature_pos = np.empty((N, 2))
-    for i, c in enumerate(creatures):
-        creature_pos[i] = c.pos
-    food_pos = np.empty((M, 2))
-    for j, f in enumerate(available_food):
-        food_pos[j] = f.position
-
-    diffs = creature_pos[:, np.newaxis, :] - food_pos[np.newaxis, :, :]
-    food_dists = np.sqrt(np.sum(diffs * diffs, axis=2))
+    geo = geometry(gen)
+    food_dists = geo.food_dist(geo.frame(creatures), available_food)
 
     food_eaten_mask = np.zeros(M, dtype=bool)
+    log = event_log(gen)
 
     for i, c in enumerate(creatures):
-        if not c.is_active() or len(c.foods_eaten) >= 2:
+        if c.n_eaten >= 2:
             continue
 
         dists_i = food_dists[i].copy()
@@ -387,7 +414,8 @@ def _act_scavenge(gen):
             continue
 
         if c.can_reach(nearest_food.position):
-            c.eat_food(gen.steps, "food")
+            c.eat_food()
+            log.record(gen.steps, c.uid, EVENT_FOOD, NO_VICTIM, nearest_food.position)
             nearest_food.mark_eaten(gen.steps)
             food_eaten_mask[nearest_idx] = True
 
@@ -398,9 +426,9 @@ def run_post(gen, stage, rng):
     """StarveBehaviour POST: if no food remains, kill active creatures with 0 food."""
     if gen.get_available_food():
         return
-    for c in gen.creatures:
-        if c.is_active() and len(c.foods_eaten) == 0:
-            c.kill()
+    for c in active_set(gen).members():
+        if c.n_eaten == 0:
+            c.kill(DeathCause.STARVED)
 
 
 # ─── FINAL phase ─────────────────────────────────────────────────────────────
@@ -408,5 +436,5 @@ def run_post(gen, stage, rng):
 def run_final(gen, stage, rng):
     """StarveBehaviour FINAL: kill all alive creatures that ate 0 food."""
     for c in gen.creatures:
-        if c.is_alive() and len(c.foods_eaten) == 0:
-            c.kill()
+        if c.is_alive() and c.n_eaten == 0:
+            c.kill(DeathCause.STARVED)
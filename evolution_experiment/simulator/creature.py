@@ -5,13 +5,54 @@ Ported from src/wasm/src/creature/mod.rs and creature/mutatable.rs.
 
 import sys
 import math
+import itertools
 import numpy as np
 from enum import IntEnum
 from .math_utils import distance_to_line
+from .events import EventLog, EVENT_KINDS, KIND_NAMES, NO_VICTIM
+from . import precision
 
 ENERGY_COST_SCALE_FACTOR = 1.0 / 10_000.0
 FLOAT_MIN_POSITIVE = sys.float_info.min
 
+NO_PARENT = -1
+UID_BITS = 40  # uids are namespace << UID_BITS | serial
+
+_uids = itertools.count()
+
+
+def uid_counter(namespace=0):
+    """A fresh source of uids: namespace << UID_BITS, then one up per new
+    creature. Counters in different namespaces (e.g. islands) never overlap."""
+    if not 0 <= namespace < 1 << (63 - UID_BITS):
+        raise ValueError(f"uid namespace out of range: {namespace!r}")
+    return itertools.count(namespace << UID_BITS)
+
+
+def reset_uids(namespace=0):
+    """Restart uid numbering. Called at the start of every run, so a run's
+    uids depend only on its seed and not on what ran before in the process."""
+    global _uids
+    _uids = uid_counter(namespace)
+
+
+class uid_scope:
+    """Context manager that takes new uids from counter and restores the
+    previous source on exit."""
+
+    def __init__(self, counter):
+        self._new = counter
+        self._old = None
+
+    def __enter__(self):
+        global _uids
+        self._old, _uids = _uids, self._new
+        return self
+
+    def __exit__(self, *exc):
+        global _uids
+        _uids = self._old
+
 
 class ObjectiveIntensity(IntEnum):
     """Ordered lowest to highest, matching the Rust enum derive(PartialOrd)."""
@@ -39,11 +80,21 @@ class CreatureState(IntEnum):
     ACTIVE = 2
 
 
+class DeathCause(IntEnum):
+    """Why a creature died; ALIVE until kill() is called."""
+    ALIVE = 0
+    UNKNOWN = 1
+    STARVED = 2
+    EATEN = 3
+    EXHAUSTED = 4
+    OLD_AGE = 5
+
+
 class Objective:
     __slots__ = ('pos', 'intensity', 'reason')
 
     def __init__(self, pos, intensity, reason):
-        self.pos = np.asarray(pos, dtype=np.float64)
+        self.pos = np.asarray(pos, dtype=precision.dtype)
         self.intensity = intensity
         self.reason = reason
 
@@ -52,7 +103,7 @@ class Food:
     __slots__ = ('position', 'eaten', 'eaten_step')
 
     def __init__(self, position):
-        self.position = np.asarray(position, dtype=np.float64)
+        self.position = np.asarray(position, dtype=precision.dtype)
         self.eaten = False
         self.eaten_step = None
 
@@ -72,13 +123,24 @@ class Creature:
         speed: (10, 0.5), size: (10, 0.5), sense_range: (20, 0.5),
         reach: (1, 0), flee_distance: (1e12, 0), life_span: (1e4, 0),
         energy: 500
+
+    Feeding history is not kept per creature: n_eaten is the running count
+    used by behaviours, and the events themselves go to the generation's
+    EventLog (see simulator/events.py). foods_eaten reads a creature's
+    feedings back from that log.
+
+    uid is kept across grow_older(); parent_uid is the uid of the creature
+    that produced it by mutate() or clone_offspring() (NO_PARENT for founders).
+    uids are unique within a run (see reset_uids), not across runs.
     """
 
     __slots__ = (
+        'uid', 'parent_uid', 'death_cause',
         'pos', 'home_pos', 'speed', 'size', 'sense_range_trait',
         'reach_trait', 'flee_distance', 'life_span', 'energy',
-        'energy_consumed', 'age', 'foods_eaten', '_prev_pos',
-        'state', 'objective',
+        '_consumed', '_consumed_at', '_clock', '_left_at',
+        'age', 'n_eaten', '_events', '_prev_pos',
+        'state', 'objective', '_watcher',
         '_eff_speed', '_eff_reach', '_eff_size', '_eff_sense',
         '_energy_cost',
     )
@@ -86,8 +148,11 @@ class Creature:
     def __init__(self, pos, speed=(10.0, 0.5), size=(10.0, 0.5),
                  sense_range=(20.0, 0.5), reach=(1.0, 0.0),
                  flee_distance=(1e12, 0.0), life_span=(1e4, 0.0),
-                 energy=500.0, age=0):
-        self.pos = np.asarray(pos, dtype=np.float64).copy()
+                 energy=500.0, age=0, uid=None, parent_uid=NO_PARENT):
+        self.uid = next(_uids) if uid is None else uid
+        self.parent_uid = parent_uid
+        self.death_cause = DeathCause.ALIVE
+        self.pos = np.array(pos, dtype=precision.dtype)
         self.home_pos = self.pos.copy()
         self.speed = (float(speed[0]), float(speed[1]))
         self.size = (float(size[0]), float(size[1]))
@@ -95,13 +160,18 @@ class Creature:
         self.reach_trait = (float(reach[0]), float(reach[1]))
         self.flee_distance = (float(flee_distance[0]), float(flee_distance[1]))
         self.life_span = (float(life_span[0]), float(life_span[1]))
-        self.energy = float(energy)
-        self.energy_consumed = 0.0
+        self.energy = precision.round_scalar(energy)
+        self._consumed = 0.0
+        self._consumed_at = 0
+        self._clock = None
+        self._left_at = None
         self.age = int(age)
-        self.foods_eaten = []
+        self.n_eaten = 0
+        self._events = None
         self._prev_pos = None
         self.state = CreatureState.ACTIVE
         self.objective = None
+        self._watcher = None
         self._cache_traits()
 
     def _cache_traits(self):
@@ -109,8 +179,8 @@ class Creature:
         self._eff_speed = self.speed[0] * self._eff_size / 10.0
         self._eff_sense = self.sense_range_trait[0]
         self._eff_reach = max(self.reach_trait[0], self._eff_size / 4.0)
-        self._energy_cost = ENERGY_COST_SCALE_FACTOR * (
-            self._eff_size ** 3 * self._eff_speed ** 2 + self._eff_sense)
+        self._energy_cost = precision.round_scalar(ENERGY_COST_SCALE_FACTOR * (
+            self._eff_size ** 3 * self._eff_speed ** 2 + self._eff_sense))
 
     # --- Effective trait accessors (match Rust getters) ---
 
@@ -134,13 +204,38 @@ class Creature:
     def get_motion_energy_cost(self):
         return self._energy_cost
 
+    @property
+    def energy_consumed(self):
+        """Energy used so far. Under an EnergySchedule, derived from the moves
+        made (see simulator/energy.py)."""
+        clock = self._clock
+        if clock is not None:
+            moves = clock.moves if self._left_at is None else self._left_at
+            if moves > self._consumed_at:
+                consumed = self._consumed
+                cost = self._energy_cost
+                for _ in range(moves - self._consumed_at):
+                    consumed = precision.round_scalar(consumed + cost)
+                self._consumed = consumed
+                self._consumed_at = moves
+        return self._consumed
+
     def get_energy_left(self):
         return max(self.energy - self.energy_consumed, 0.0)
 
     def apply_energy_cost(self, cost):
-        self.energy_consumed += cost
+        self._consumed = precision.round_scalar(self.energy_consumed + cost)
         if self.get_energy_left() <= 0.0:
-            self.state = CreatureState.DEAD
+            self.kill(DeathCause.EXHAUSTED)
+        elif self._clock is not None:
+            self._clock.reschedule(self)
+
+    def _attach_clock(self, clock):
+        """Let clock (an EnergySchedule starting at move 0) account for moves."""
+        self._consumed = self.energy_consumed
+        self._consumed_at = 0
+        self._left_at = None
+        self._clock = clock
 
     # --- State queries ---
 
@@ -153,9 +248,12 @@ class Creature:
     # --- Movement ---
 
     def move_to(self, pos):
+        """Move to pos and pay the motion cost, which an attached
+        EnergySchedule accounts for instead."""
         self._prev_pos = self.pos.copy()
-        self.pos = np.asarray(pos, dtype=np.float64).copy()
-        self.apply_energy_cost(self.get_motion_energy_cost())
+        self.pos = np.array(pos, dtype=precision.dtype)
+        if self._clock is None:
+            self.apply_energy_cost(self.get_motion_energy_cost())
 
     def get_last_position(self):
         return self._prev_pos
@@ -254,14 +352,46 @@ class Creature:
 
     # --- Actions ---
 
-    def eat_food(self, step, food_type="food"):
-        self.foods_eaten.append((step, food_type))
+    def eat_food(self, step=None, food_type="food"):
+        """Count one feeding. Behaviours log the event themselves; callers
+        that pass step get it recorded here (no victim, at the creature's
+        position)."""
+        self.n_eaten += 1
+        if step is not None:
+            if food_type not in EVENT_KINDS:
+                raise ValueError(f"Unknown food type: {food_type!r} "
+                                 f"(choose from {', '.join(EVENT_KINDS)})")
+            if self._events is None:
+                self._events = EventLog()
+            self._events.record(step, self.uid, EVENT_KINDS[food_type],
+                                NO_VICTIM, self.pos)
+
+    @property
+    def foods_eaten(self):
+        """(step, food_type) of each feeding this generation, from the event
+        log. Builds a new list on every read; use n_eaten for counts."""
+        log = self._events
+        if log is None:
+            return []
+        mine = log.eater == self.uid
+        return [(step, KIND_NAMES[kind])
+                for step, kind in zip(log.step[mine].tolist(), log.kind[mine].tolist())]
 
     def sleep(self):
-        self.state = CreatureState.ASLEEP
+        self._leave_active(CreatureState.ASLEEP)
+
+    def kill(self, cause=DeathCause.UNKNOWN):
+        if self.state != CreatureState.DEAD:
+            self.death_cause = cause
+        self._leave_active(CreatureState.DEAD)
 
-    def kill(self):
-        self.state = CreatureState.DEAD
+    def _leave_active(self, state):
+        if self.state == CreatureState.ACTIVE:
+            if self._watcher is not None:
+                self._watcher.dirty = True
+            if self._clock is not None:
+                self._left_at = self._clock.moves
+        self.state = state
 
     # --- Reproduction ---
 
@@ -285,6 +415,7 @@ class Creature:
             life_span=(_pnz(self.life_span[0], self.life_span[1]), self.life_span[1]),
             energy=self.energy,
             age=0,
+            parent_uid=self.uid,
         )
 
     def grow_older(self):
@@ -299,6 +430,8 @@ class Creature:
             life_span=self.life_span,
             energy=self.energy,
             age=self.age + 1,
+            uid=self.uid,
+            parent_uid=self.parent_uid,
         )
 
     def clone_offspring(self):
@@ -313,6 +446,7 @@ class Creature:
             life_span=self.life_span,
             energy=self.energy,
             age=0,
+            parent_uid=self.uid,
         )
 
 
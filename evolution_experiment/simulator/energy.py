@@ -0,0 +1,113 @@
+"""
+Energy-depletion scheduler: exhaustion deaths from a priority queue.
+
+Every move costs a creature the same amount, get_motion_energy_cost(), and
+every active creature moves exactly once per step. A creature's energy after
+k moves is therefore known in advance, and so is the move on which it runs
+out. EnergySchedule keeps those predicted exhaustion moves in a heap. run_move
+advances the schedule by one move per step and kills the creatures whose
+move has come, instead of every creature updating and re-checking its energy
+on every move.
+
+Creature.energy_consumed is derived from the number of moves the creature
+has made under the schedule (frozen when it stops being active), only when
+something reads it. The derivation repeats the rounded additions of
+apply_energy_cost one by one, and the predictions use an accumulate with the
+same rounding, so energies and the step each creature dies on are
+bit-identical to per-move bookkeeping, in float64 and float32.
+
+Predictions are made WINDOW moves at a time. A creature that is still not
+exhausted at the end of its window is replanned from there, so long-lived
+creatures cost nothing up front.
+"""
+
+import heapq
+import itertools
+
+import numpy as np
+
+from . import precision
+from .creature import CreatureState
+
+WINDOW = 64
+_EXHAUSTED = 0
+_REPLAN = 1
+
+
+class EnergySchedule:
+    """Per-generation move counter and heap of predicted exhaustion moves."""
+
+    __slots__ = ('moves', '_heap', '_seq', '_entry')
+
+    def __init__(self, creatures):
+        self.moves = 0
+        self._heap = []
+        self._seq = itertools.count()
+        self._entry = {}
+        active = [c for c in creatures if c.state == CreatureState.ACTIVE]
+        for c in active:
+            c._attach_clock(self)
+        self._plan(active)
+
+    def _push(self, move, kind, c):
+        seq = next(self._seq)
+        self._entry[id(c)] = seq
+        heapq.heappush(self._heap, (move, seq, kind, c))
+
+    def _plan(self, creatures):
+        """Predict, for each creature, the first of the next WINDOW moves
+        after which its energy left is <= 0."""
+        if not creatures:
+            return
+        n = len(creatures)
+        dtype = precision.dtype
+        energy = np.array([c.energy for c in creatures], dtype=dtype)
+        running = np.empty((n, WINDOW + 1), dtype=dtype)
+        running[:, 0] = [c.energy_consumed for c in creatures]
+        running[:, 1:] = np.array([c.get_motion_energy_cost() for c in creatures],
+                                  dtype=dtype)[:, np.newaxis]
+        # Sequential per row, rounding every sum to the engine dtype, exactly
+        # like apply_energy_cost. energy - consumed <= 0 <=> consumed >= energy.
+        spent = np.add.accumulate(running, axis=1)[:, 1:] >= energy[:, np.newaxis]
+        hit = spent.any(axis=1)
+        first = spent.argmax(axis=1) + 1
+        start = self.moves
+        for c, h, k in zip(creatures, hit.tolist(), first.tolist()):
+            if h:
+                self._push(start + k, _EXHAUSTED, c)
+            else:
+                self._push(start + WINDOW, _REPLAN, c)
+
+    def reschedule(self, c):
+        """Re-predict c after its consumption changed outside the schedule."""
+        if c.state == CreatureState.ACTIVE:
+            self._plan([c])
+
+    def advance(self):
+        """Every active creature has made one more move. Returns the creatures
+        whose energy ran out on it."""
+        self.moves = moves = self.moves + 1
+        heap = self._heap
+        entry = self._entry
+        exhausted = []
+        replan = []
+        while heap and heap[0][0] <= moves:
+            _, seq, kind, c = heapq.heappop(heap)
+            if entry.get(id(c)) != seq or c.state != CreatureState.ACTIVE:
+                continue
+            del entry[id(c)]
+            if kind == _EXHAUSTED:
+                exhausted.append(c)
+            else:
+                replan.append(c)
+        self._plan(replan)
+        return exhausted
+
+
+def energy_schedule(gen):
+    """The generation's energy schedule, created on first use (before the
+    first move)."""
+    sched = getattr(gen, "energy_schedule", None)
+    if sched is None:
+        sched = gen.energy_schedule = EnergySchedule(gen.creatures)
+    return sched
@@ -0,0 +1,131 @@
+"""
+Columnar per-generation log of eat/kill events.
+
+Behaviours append one row per feeding: the step, the eater's uid, what was
+eaten (food item or creature), the victim's uid (-1 for food) and where it
+happened. Columns are growable NumPy arrays, so recording is amortised O(1)
+and the whole log exports without touching Python objects.
+
+EventRecorder collects the logs of every generation a Simulation.run
+produces, for raw_data.write_events_csv (`simulate --events`).
+"""
+
+import numpy as np
+
+from .hooks import GenerationObserver, add_observer, remove_observer
+
+EVENT_FOOD = 0
+EVENT_CREATURE = 1
+EVENT_KINDS = {"food": EVENT_FOOD, "creature": EVENT_CREATURE}
+KIND_NAMES = {code: name for name, code in EVENT_KINDS.items()}
+NO_VICTIM = -1
+
+_INITIAL_CAPACITY = 64
+
+
+class EventLog:
+    __slots__ = ('_n', '_step', '_eater', '_kind', '_victim', '_pos')
+
+    def __init__(self, capacity=_INITIAL_CAPACITY):
+        self._n = 0
+        self._step = np.empty(capacity, dtype=np.int32)
+        self._eater = np.empty(capacity, dtype=np.int64)
+        self._kind = np.empty(capacity, dtype=np.int8)
+        self._victim = np.empty(capacity, dtype=np.int64)
+        self._pos = np.empty((capacity, 2), dtype=np.float64)
+
+    def __len__(self):
+        return self._n
+
+    def _grow(self):
+        cap = 2 * len(self._step)
+        for name in ('_step', '_eater', '_kind', '_victim', '_pos'):
+            old = getattr(self, name)
+            new = np.empty((cap,) + old.shape[1:], dtype=old.dtype)
+            new[:self._n] = old[:self._n]
+            setattr(self, name, new)
+
+    def record(self, step, eater_uid, kind, victim_uid, pos):
+        if self._n == len(self._step):
+            self._grow()
+        i = self._n
+        self._step[i] = step
+        self._eater[i] = eater_uid
+        self._kind[i] = kind
+        self._victim[i] = victim_uid
+        self._pos[i, 0] = pos[0]
+        self._pos[i, 1] = pos[1]
+        self._n = i + 1
+
+    # --- Column views (valid until the next record) ---
+
+    @property
+    def step(self):
+        return self._step[:self._n]
+
+    @property
+    def eater(self):
+        return self._eater[:self._n]
+
+    @property
+    def kind(self):
+        return self._kind[:self._n]
+
+    @property
+    def victim(self):
+        return self._victim[:self._n]
+
+    @property
+    def pos(self):
+        return self._pos[:self._n]
+
+    def kills(self):
+        """Mask of creature-eating events."""
+        return self.kind == EVENT_CREATURE
+
+    def columns(self):
+        """Copy of the log as a dict of 1-D arrays."""
+        return {
+            "step": self.step.copy(),
+            "eater_uid": self.eater.copy(),
+            "kind": self.kind.copy(),
+            "victim_uid": self.victim.copy(),
+            "x": self.pos[:, 0].copy(),
+            "y": self.pos[:, 1].copy(),
+        }
+
+
+def event_log(gen):
+    """The generation's event log, created on first use and shared with its
+    creatures (Creature.foods_eaten)."""
+    log = getattr(gen, "events", None)
+    if log is None:
+        log = gen.events = EventLog()
+        for c in gen.creatures:
+            c._events = log
+    return log
+
+
+class EventRecorder(GenerationObserver):
+    """Collect the event log of every generation run by Simulation.run while
+    active, as (phase, generation, EventLog) in `logs`. The phase is the
+    run's phase_label and generations are numbered from 0 within each run,
+    like the metric rows. Generations built outside Simulation.run (OPT
+    search evaluations) are not recorded."""
+
+    def __init__(self):
+        self.logs = []
+
+    def end_generation(self, gen, phase, generation):
+        if phase is None:
+            return
+        log = getattr(gen, "events", None)
+        if log is not None:
+            self.logs.append((phase, generation, log))
+
+    def __enter__(self):
+        add_observer(self)
+        return self
+
+    def __exit__(self, *exc):
+        remove_observer(self)
@@ -0,0 +1,221 @@
+"""
+Step-scoped geometry shared by the ORIENT and ACT behaviours.
+
+Creature positions only change in MOVE. Between two MOVEs, every distance the
+behaviours need can therefore come from one gather of the active creatures'
+positions. StepGeometry owns that gather (a Frame) and computes
+creature–creature and creature–food squared distances and distances lazily,
+at most once each. run_move invalidates it.
+
+Later callers usually ask about a subset of the gathered creatures, possibly
+reordered: ACT scavenge after cannibalism kills, or the next step's ORIENT
+after PRE has reshuffled and dropped sleepers. Those frames index the cached
+arrays instead of recomputing them. Trait values are fixed for a generation,
+so they are carried over from the previous frame even across an invalidation.
+They are kept as exact float64 columns (the Python floats the Creature
+getters return) and exposed as engine-dtype arrays for the matrix code.
+
+Distances are computed as sqrt(dx*dx + dy*dy) in the engine's float dtype,
+matching the matrices the behaviours used to build themselves.
+"""
+
+import numpy as np
+from . import precision
+
+
+TRAITS = ("size", "speed", "sense", "reach", "flee", "cost")
+
+
+def _sq_dists(a, b):
+    dx = a[:, 0, np.newaxis] - b[np.newaxis, :, 0]
+    dy = a[:, 1, np.newaxis] - b[np.newaxis, :, 1]
+    return dx * dx + dy * dy
+
+
+class Frame:
+    """Positions and traits of `creatures` (in that order), with lazy distances.
+
+    A frame is either a root, gathered from the creatures themselves, or a
+    view of a root selected by `rows`. traits64 is a (len(TRAITS), N) float64
+    array; size, speed, sense, reach and flee are its engine-dtype rows."""
+
+    __slots__ = (
+        'creatures', 'pos', 'traits64', 'size', 'speed', 'sense', 'reach', 'flee',
+        '_root', '_rows', '_row_of', '_dist_sq', '_dist',
+        '_food_cols', '_food_dist_sq', '_food_dist',
+    )
+
+    def __init__(self, creatures, pos, traits64, root=None, rows=None):
+        self.creatures = creatures
+        self.pos = pos
+        self.traits64 = traits64
+        self.size, self.speed, self.sense, self.reach, self.flee = (
+            traits64[:5].astype(precision.dtype, copy=False))
+        self._root = root
+        self._rows = rows
+        self._row_of = None
+        self._dist_sq = None
+        self._dist = None
+        self._food_cols = None
+        self._food_dist_sq = None
+        self._food_dist = None
+
+    def rows(self, creatures):
+        """Row of each creature in this frame, or None if one is missing."""
+        row_of = self._row_of
+        if row_of is None:
+            row_of = self._row_of = {id(c): k for k, c in enumerate(self.creatures)}
+        try:
+            return np.fromiter((row_of[id(c)] for c in creatures),
+                               dtype=np.intp, count=len(creatures))
+        except KeyError:
+            return None
+
+    def column(self, name):
+        """Exact float64 values of trait `name` (see TRAITS)."""
+        return self.traits64[TRAITS.index(name)]
+
+    def take(self, creatures, rows):
+        return Frame(creatures, self.pos[rows], self.traits64[:, rows],
+                     root=self, rows=rows)
+
+    # --- Creature–creature ---
+
+    def dist_sq(self):
+        """(N, N) squared distances between the frame's creatures."""
+        if self._dist_sq is None:
+            root = self._root
+            if root is not None and root._dist_sq is not None:
+                self._dist_sq = root._dist_sq[np.ix_(self._rows, self._rows)]
+            else:
+                self._dist_sq = _sq_dists(self.pos, self.pos)
+        return self._dist_sq
+
+    def dist(self):
+        """(N, N) distances between the frame's creatures."""
+        if self._dist is None:
+            root = self._root
+            if root is not None and root._dist is not None:
+                self._dist = root._dist[np.ix_(self._rows, self._rows)]
+            else:
+                self._dist = np.sqrt(self.dist_sq())
+        return self._dist
+
+    # --- Creature–food ---
+
+    def _food_matrix(self, cols, food_xy, which):
+        """Cached (N, len(cols)) matrix `which` ('sq' or 'dist') for food columns
+        `cols` of the generation's food table."""
+        if self._food_cols is not None:
+            pos_in_cache = self._food_cols.get
+            sel = [pos_in_cache(j) for j in cols]
+            if None not in sel:
+                mat = self._food_dist_sq if which == "sq" else self._food_matrix_dist()
+                if len(sel) == len(self._food_cols) and sel == list(range(len(sel))):
+                    return mat
+                return mat[:, sel]
+
+        root = self._root
+        if root is not None and root._food_cols is not None:
+            pos_in_cache = root._food_cols.get
+            sel = [pos_in_cache(j) for j in cols]
+            if None not in sel:
+                self._food_cols = {j: k for k, j in enumerate(cols)}
+                self._food_dist_sq = root._food_dist_sq[np.ix_(self._rows, sel)]
+                if root._food_dist is not None:
+                    self._food_dist = root._food_dist[np.ix_(self._rows, sel)]
+                return self._food_dist_sq if which == "sq" else self._food_matrix_dist()
+
+        self._food_cols = {j: k for k, j in enumerate(cols)}
+        self._food_dist_sq = _sq_dists(self.pos, food_xy[cols])
+        self._food_dist = None
+        return self._food_dist_sq if which == "sq" else self._food_matrix_dist()
+
+    def _food_matrix_dist(self):
+        if self._food_dist is None:
+            self._food_dist = np.sqrt(self._food_dist_sq)
+        return self._food_dist
+
+
+class StepGeometry:
+    """Per-generation owner of the current Frame; see the module docstring."""
+
+    __slots__ = ('_frame', '_root', '_stale', '_food_index', '_food_xy', 'n_gathers')
+
+    def __init__(self):
+        self._frame = None
+        self._root = None
+        self._stale = None
+        self._food_index = {}
+        self._food_xy = np.empty((0, 2), dtype=precision.dtype)
+        self.n_gathers = 0
+
+    def invalidate(self):
+        """Creature positions changed: drop every cached position and distance."""
+        if self._root is not None:
+            self._stale = self._root
+        self._frame = None
+        self._root = None
+
+    def frame(self, creatures):
+        """Frame for `creatures` (e.g. active_set(gen).members())."""
+        frame = self._frame
+        if frame is not None and frame.creatures is creatures:
+            return frame
+        root = self._root
+        if root is not None:
+            rows = root.rows(creatures)
+            if rows is not None:
+                frame = self._frame = root.take(creatures, rows)
+                return frame
+        frame = self._frame = self._root = self._gather(creatures)
+        return frame
+
+    def _gather(self, creatures):
+        self.n_gathers += 1
+        n = len(creatures)
+        dtype = precision.dtype
+        pos = np.array([c.pos for c in creatures], dtype=dtype).reshape(n, 2)
+        stale = self._stale
+        rows = stale.rows(creatures) if stale is not None else None
+        if rows is not None:
+            traits64 = stale.traits64[:, rows]
+        else:
+            traits64 = np.array(
+                [(c.get_size(), c.get_speed(), c.get_sense_range(), c.get_reach(),
+                  c.flee_distance[0], c.get_motion_energy_cost()) for c in creatures],
+                dtype=np.float64).reshape(n, len(TRAITS)).T
+        return Frame(creatures, pos, traits64)
+
+    # --- Food ---
+
+    def _food_columns(self, food):
+        index = self._food_index
+        cols = [index.get(id(f)) for f in food]
+        if None in cols:
+            for f in food:
+                if id(f) not in index:
+                    index[id(f)] = len(index)
+            xy = np.array([f.position for f in food], dtype=precision.dtype).reshape(len(food), 2)
+            new = np.empty((len(index), 2), dtype=precision.dtype)
+            new[:len(self._food_xy)] = self._food_xy
+            cols = [index[id(f)] for f in food]
+            new[cols] = xy
+            self._food_xy = new
+        return cols
+
+    def food_dist_sq(self, frame, food):
+        """(N, M) squared distances from `frame`'s creatures to `food`."""
+        return frame._food_matrix(self._food_columns(food), self._food_xy, "sq")
+
+    def food_dist(self, frame, food):
+        """(N, M) distances from `frame`'s creatures to `food`."""
+        return frame._food_matrix(self._food_columns(food), self._food_xy, "dist")
+
+
+def geometry(gen):
+    """The generation's step geometry, created on first use."""
+    geo = getattr(gen, "geometry", None)
+    if geo is None:
+        geo = gen.geometry = StepGeometry()
+    return geo
@@ -0,0 +1,95 @@
+"""
+Shared observation hook on Generation construction and Simulation.run.
+
+Recorders (lineage, events, memory instrumentation) register an observer
+here instead of patching the classes themselves, so any combination of them
+can be active, entered in any order. Generation.__init__ and Simulation.run
+are patched once, when the first observer is added, and restored when the
+last one is removed.
+
+Every generation is reported with the phase_label of the Simulation.run
+that built it and its index within that run (0, 1, ...), which is how the
+metric rows are keyed. Generations built outside a run (OPT search
+evaluations) have phase and generation None.
+
+Observers subclass GenerationObserver and override what they need. Those
+with measures = True (timing, memory) are begun after and ended before all
+others, so only the generation itself falls inside their window.
+"""
+
+
+class GenerationObserver:
+    measures = False
+
+    def begin_generation(self, phase, generation):
+        """Called before Generation.__init__ runs."""
+
+    def end_generation(self, gen, phase, generation):
+        """Called after Generation.__init__ returns (the generation has run)."""
+
+
+_observers = []
+_originals = None
+_phase = None
+_generation = 0  # index of the next generation in the current run
+
+
+def _ordered():
+    return ([o for o in _observers if not o.measures]
+            + [o for o in _observers if o.measures])
+
+
+def _install():
+    global _originals
+    from .generation import Generation
+    from .simulation import Simulation
+
+    gen_init = Generation.__dict__["__init__"]
+    sim_run = Simulation.__dict__["run"]
+    _originals = (gen_init, sim_run)
+
+    def __init__(gen, *args, **kwargs):
+        global _generation
+        phase = _phase
+        index = _generation if phase is not None else None
+        observers = _ordered()
+        for obs in observers:
+            obs.begin_generation(phase, index)
+        gen_init(gen, *args, **kwargs)
+        if phase is not None:
+            _generation += 1
+        for obs in reversed(observers):
+            obs.end_generation(gen, phase, index)
+
+    def run(sim, *args, phase_label="train", **kwargs):
+        global _phase, _generation
+        outer = _phase, _generation
+        _phase, _generation = phase_label, 0
+        try:
+            return sim_run(sim, *args, phase_label=phase_label, **kwargs)
+        finally:
+            _phase, _generation = outer
+
+    Generation.__init__ = __init__
+    Simulation.run = run
+
+
+def _uninstall():
+    global _originals
+    from .generation import Generation
+    from .simulation import Simulation
+
+    Generation.__init__, Simulation.run = _originals
+    _originals = None
+
+
+def add_observer(observer):
+    if not _observers:
+        _install()
+    _observers.append(observer)
+
+
+def remove_observer(observer):
+    _observers.remove(observer)
+    if not _observers:
+        _uninstall()
@@ -0,0 +1,223 @@
+"""
+Opt-in allocation and memory instrumentation, reported per generation.
+
+    with MemoryInstrumentation() as mem:
+        metrics, survivors, steps = sim.run(...)
+    mem.write_csv("memory_profile.csv")
+
+While active, it records one row for every generation run by
+Simulation.run (each generation runs to completion inside
+Generation.__init__), keyed by the run's phase label and the generation's
+index within the run, like the metric rows. Generations built outside a run
+(OPT search evaluations) get no row and their allocations are not counted.
+Each row holds:
+  - instances allocated of Creature, Objective and Food, with shallow bytes
+    (allocations between generations, i.e. reproduction, count towards the
+    generation they populate)
+  - peak traced memory (tracemalloc, which includes NumPy array buffers)
+    during each behaviour phase, e.g. the N×N matrices of _orient_cannibalism
+  - NumPy buffers still allocated when the generation ends, as a count and
+    bytes (ndarray_*_at_end). Temporaries freed within a phase are not
+    counted one by one; their footprint is what peak_<phase>_bytes measures
+  - GC collections and total GC pause time
+  - process peak RSS
+
+The hooks are installed by patching class constructors and behaviour module
+globals on __enter__ and restored on __exit__; generations are observed
+through simulator.hooks. Nothing is paid when the
+instrumentation is off. Phases are patched in simulator.behaviours and in
+simulator.generation if it imported them by name. tracemalloc slows the
+simulation down a lot, so only compare these runs with each other.
+"""
+
+import csv
+import gc
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from . import behaviours
+from .creature import Creature, Objective, Food
+from .hooks import GenerationObserver, add_observer, remove_observer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+COUNTED_TYPES = (Creature, Objective, Food)
+PHASES = (
+    "run_init", "run_pre", "_orient_wander", "_orient_cannibalism",
+    "_orient_scavenge", "_orient_satisfied", "run_move",
+    "_act_cannibalism", "_act_scavenge", "run_post", "run_final",
+)
+_NUMPY_DOMAIN = getattr(np.lib, "tracemalloc_domain", 389047)
+
+
+def _peak_rss_kb():
+    if resource is None:
+        return float("nan")
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024.0 if sys.platform == "darwin" else float(rss)
+
+
+def _shallow_size(obj):
+    size = sys.getsizeof(obj)
+    for name in getattr(type(obj), "__slots__", ()):
+        value = getattr(obj, name, None)
+        if isinstance(value, np.ndarray):
+            size += value.nbytes
+    return size
+
+
+class MemoryInstrumentation(GenerationObserver):
+    measures = True
+
+    def __init__(self, label=None, trace_frames=1):
+        self.label = label
+        self.rows = []
+        self._trace_frames = trace_frames
+        self._patched = []
+        self._row = None
+        self._between = self._zero_counts()
+        self._gc_start = None
+        self._started_tracemalloc = False
+
+    @staticmethod
+    def _zero_counts():
+        counts = {}
+        for cls in COUNTED_TYPES:
+            counts[f"alloc_{cls.__name__}"] = 0
+            counts[f"bytes_{cls.__name__}"] = 0
+        return counts
+
+    # --- Hook installation ---
+
+    def _patch(self, owner, name, replacement):
+        self._patched.append((owner, name, owner.__dict__.get(name, getattr(owner, name))))
+        setattr(owner, name, replacement)
+
+    def _count_type(self, cls):
+        original = cls.__init__
+        key = cls.__name__
+
+        def __init__(obj, *args, **kwargs):
+            original(obj, *args, **kwargs)
+            counts = self._row if self._row is not None else self._between
+            counts[f"alloc_{key}"] += 1
+            counts[f"bytes_{key}"] += _shallow_size(obj)
+
+        self._patch(cls, "__init__", __init__)
+
+    def _time_phase(self, module, name, fn):
+        key = f"peak_{name.lstrip('_')}_bytes"
+
+        def wrapper(*args, **kwargs):
+            row = self._row
+            if row is None:
+                return fn(*args, **kwargs)
+            base, peak_so_far = tracemalloc.get_traced_memory()
+            # reset_peak() is global, so carry the generation-wide peak over.
+            row["_abs_peak"] = max(row["_abs_peak"], peak_so_far)
+            tracemalloc.reset_peak()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                peak = tracemalloc.get_traced_memory()[1]
+                row["_abs_peak"] = max(row["_abs_peak"], peak)
+                if peak - base > row[key]:
+                    row[key] = peak - base
+
+        self._patch(module, name, wrapper)
+
+    def _on_gc(self, phase, info):
+        if self._row is None:
+            return
+        if phase == "start":
+            self._gc_start = time.perf_counter()
+        elif self._gc_start is not None:
+            self._row["gc_pause_s"] += time.perf_counter() - self._gc_start
+            self._row["gc_collections"] += 1
+            self._gc_start = None
+
+    def __enter__(self):
+        from . import generation as generation_module
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self._trace_frames)
+            self._started_tracemalloc = True
+        for cls in COUNTED_TYPES:
+            self._count_type(cls)
+        for name in PHASES:
+            fn = getattr(behaviours, name)
+            self._time_phase(behaviours, name, fn)
+            if getattr(generation_module, name, None) is fn:
+                self._time_phase(generation_module, name, fn)
+        add_observer(self)
+        gc.callbacks.append(self._on_gc)
+        return self
+
+    def __exit__(self, *exc):
+        gc.callbacks.remove(self._on_gc)
+        remove_observer(self)
+        self._row = None
+        for owner, name, original in reversed(self._patched):
+            setattr(owner, name, original)
+        self._patched = []
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    # --- Per-generation records ---
+
+    def begin_generation(self, phase, generation):
+        if phase is None:
+            self._between = self._zero_counts()
+            return
+        row = {"phase": phase, "generation": generation}
+        if self.label is not None:
+            row["label"] = self.label
+        row.update(self._between)
+        self._between = self._zero_counts()
+        for name in PHASES:
+            row[f"peak_{name.lstrip('_')}_bytes"] = 0
+        row["gc_collections"] = 0
+        row["gc_pause_s"] = 0.0
+        row["_t0"] = time.perf_counter()
+        tracemalloc.reset_peak()
+        row["_traced0"] = row["_abs_peak"] = tracemalloc.get_traced_memory()[0]
+        self._row = row
+
+    def end_generation(self, gen, phase, generation):
+        if phase is None:
+            self._between = self._zero_counts()
+            return
+        row = self._row
+        self._row = None
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.DomainFilter(True, _NUMPY_DOMAIN)])
+        row["n_creatures"] = len(gen.creatures)
+        row["steps"] = getattr(gen, "steps", None)
+        row["wall_s"] = time.perf_counter() - row.pop("_t0")
+        row["traced_peak_bytes"] = max(row.pop("_abs_peak"), peak) - row.pop("_traced0")
+        row["traced_current_bytes"] = current
+        stats = snapshot.statistics("filename")
+        row["ndarray_buffers_at_end"] = sum(s.count for s in stats)
+        row["ndarray_bytes_at_end"] = sum(s.size for s in stats)
+        row["rss_peak_kb"] = _peak_rss_kb()
+        self.rows.append(row)
+
+    def write_csv(self, path, extra=None):
+        """Write the table; extra columns (e.g. seed, condition) prefix each row."""
+        rows = [{**(extra or {}), **r} for r in self.rows]
+        if not rows:
+            return path
+        fields = list(dict.fromkeys(k for r in rows for k in r))
+        with open(path, "w", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
@@ -0,0 +1,231 @@
+"""
+Append-only, memory-mapped lineage store.
+
+One fixed-size record per creature per generation it lived through: uid,
+parent uid, generation, age, traits (fixed for life, so these are its birth
+traits), food eaten that generation and how the generation ended for it
+(DeathCause.ALIVE if it survived). A creature keeps its uid across
+grow_older(), and offspring point at their parent through parent_uid, so
+the records form the full genealogy of a run.
+
+    with LineageRecorder(path, seed=seed):
+        conditions.run_evo(seed)
+    lin = Lineage.open(path)
+    lin.ancestry(uid)            # uid, parent, grandparent, ... founder
+    lin.founders(uids)           # founder of every uid, vectorised
+    lin.lineage_sizes()          # living descendants per founder × generation
+
+Writes go through an in-memory buffer flushed in large blocks. Recording
+costs one pass over gen.creatures per generation. Files are read back with
+np.memmap, so queries touch only the pages they need even for millions of
+records. A truncated trailing record (e.g. after a crash) is ignored.
+"""
+
+import os
+
+import numpy as np
+
+from .creature import NO_PARENT
+from .hooks import GenerationObserver, add_observer, remove_observer
+
+MAGIC = b"EVOLIN01"
+_HEADER = np.dtype([("magic", "S8"), ("seed", "<i8")])
+RECORD_DTYPE = np.dtype([
+    ("generation", "<i4"),
+    ("uid", "<i8"),
+    ("parent_uid", "<i8"),
+    ("age", "<i4"),
+    ("speed", "<f8"),
+    ("size", "<f8"),
+    ("sense_range", "<f8"),
+    ("reach", "<f8"),
+    ("flee_distance", "<f8"),
+    ("life_span", "<f8"),
+    ("n_eaten", "<i2"),
+    ("cause", "i1"),
+])
+_FLUSH_RECORDS = 1 << 16
+
+
+# ─── Writing ─────────────────────────────────────────────────────────────────
+
+class LineageWriter:
+    """Buffered appender for one run's lineage file."""
+
+    def __init__(self, path, seed=-1):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._fh = open(path, "ab")
+        if new:
+            header = np.zeros(1, dtype=_HEADER)
+            header["magic"] = MAGIC
+            header["seed"] = seed
+            self._fh.write(header.tobytes())
+        self._rows = []
+        self.n_records = 0
+
+    def append_generation(self, generation, creatures):
+        self._rows.extend(
+            (generation, c.uid, c.parent_uid, c.age, c.speed[0], c.size[0],
+             c.sense_range_trait[0], c.reach_trait[0], c.flee_distance[0],
+             c.life_span[0], c.n_eaten, c.death_cause)
+            for c in creatures)
+        if len(self._rows) >= _FLUSH_RECORDS:
+            self.flush()
+
+    def flush(self):
+        if self._rows:
+            block = np.array(self._rows, dtype=RECORD_DTYPE)
+            self._fh.write(block.tobytes())
+            self.n_records += len(block)
+            self._rows = []
+        self._fh.flush()
+
+    def close(self):
+        if self._fh is not None:
+            self.flush()
+            self._fh.close()
+            self._fh = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LineageRecorder(GenerationObserver):
+    """Record every Generation constructed while active (each generation runs
+    to completion inside Generation.__init__) into a LineageWriter.
+    Generations are numbered consecutively from first_generation, so an EVO
+    run's transfer generations follow its training generations."""
+
+    def __init__(self, path, seed=-1, first_generation=0):
+        self.writer = LineageWriter(path, seed)
+        self.generation = first_generation
+
+    def end_generation(self, gen, phase, generation):
+        self.writer.append_generation(self.generation, gen.creatures)
+        self.generation += 1
+
+    def __enter__(self):
+        add_observer(self)
+        return self
+
+    def __exit__(self, *exc):
+        remove_observer(self)
+        self.writer.close()
+
+
+# ─── Reading and queries ─────────────────────────────────────────────────────
+
+class Lineage:
+    """Read-only view of a lineage file with vectorised genealogy queries."""
+
+    def __init__(self, records, seed=-1):
+        self.records = records
+        self.seed = seed
+        self._uids = None
+        self._parents = None
+        self._birth = None
+
+    @classmethod
+    def open(cls, path):
+        header = np.fromfile(path, dtype=_HEADER, count=1)
+        if len(header) != 1 or header["magic"][0] != MAGIC:
+            raise ValueError(f"{path} is not a lineage file")
+        n = (os.path.getsize(path) - _HEADER.itemsize) // RECORD_DTYPE.itemsize
+        if n == 0:
+            records = np.empty(0, dtype=RECORD_DTYPE)
+        else:
+            records = np.memmap(path, dtype=RECORD_DTYPE, mode="r",
+                                offset=_HEADER.itemsize, shape=(n,))
+        return cls(records, int(header["seed"][0]))
+
+    def __len__(self):
+        return len(self.records)
+
+    def _index(self):
+        """Sorted unique uids with each one's parent and first generation."""
+        if self._uids is None:
+            uid = np.asarray(self.records["uid"])
+            self._uids, first = np.unique(uid, return_index=True)
+            self._parents = np.asarray(self.records["parent_uid"])[first]
+            self._birth = np.asarray(self.records["generation"])[first]
+        return self._uids, self._parents, self._birth
+
+    def _positions(self, uids):
+        """Index of each uid in the sorted uid table (-1 if unknown)."""
+        table = self._index()[0]
+        uids = np.asarray(uids, dtype=np.int64).reshape(-1)
+        if len(table) == 0:
+            return np.full(len(uids), -1, dtype=np.intp)
+        pos = np.minimum(np.searchsorted(table, uids), len(table) - 1)
+        return np.where(table[pos] == uids, pos, -1)
+
+    def parents(self, uids):
+        """Parent uid of each uid (NO_PARENT for founders and unknown uids)."""
+        pos = self._positions(uids)
+        parents = self._index()[1]
+        return np.where(pos >= 0, parents[np.maximum(pos, 0)], NO_PARENT)
+
+    def birth_generation(self, uids):
+        pos = self._positions(uids)
+        return np.where(pos >= 0, self._index()[2][np.maximum(pos, 0)], -1)
+
+    def ancestry(self, uid):
+        """uid followed by its parent, grandparent, ... up to its founder."""
+        chain = [int(uid)]
+        while True:
+            parent = int(self.parents([chain[-1]])[0])
+            if parent == NO_PARENT:
+                return np.array(chain, dtype=np.int64)
+            chain.append(parent)
+
+    def founders(self, uids=None):
+        """Founder (ancestor without a recorded parent) of every uid, by pointer
+        doubling over the whole parent table: O(log depth) vector passes."""
+        table, parents, _ = self._index()
+        ppos = self._positions(parents)
+        up = np.where(ppos >= 0, ppos, np.arange(len(table)))
+        while True:
+            nxt = up[up]
+            if np.array_equal(nxt, up):
+                break
+            up = nxt
+        roots = table[up]
+        if uids is None:
+            return roots
+        pos = self._positions(uids)
+        return np.where(pos >= 0, roots[np.maximum(pos, 0)], NO_PARENT)
+
+    def lineage_sizes(self):
+        """Living members of every founder's lineage in each generation.
+        Returns (generations, founder_uids, counts[generation, founder])."""
+        gen = np.asarray(self.records["generation"])
+        roots = self.founders(np.asarray(self.records["uid"]))
+        generations, g_idx = np.unique(gen, return_inverse=True)
+        founder_uids, f_idx = np.unique(roots, return_inverse=True)
+        shape = (len(generations), len(founder_uids))
+        counts = np.bincount(g_idx * shape[1] + f_idx,
+                             minlength=shape[0] * shape[1]).reshape(shape)
+        return generations, founder_uids, counts
+
+    def extant_lineages(self):
+        """Lineage-survival curve: (generations, number of founders with at
+        least one living descendant)."""
+        generations, _, counts = self.lineage_sizes()
+        return generations, (counts > 0).sum(axis=1)
+
+    def descendants(self, uid):
+        """All uids descending from uid (excluding uid itself)."""
+        table, parents, _ = self._index()
+        found = np.zeros(len(table), dtype=bool)
+        frontier = np.array([uid], dtype=np.int64)
+        while frontier.size:
+            children = np.isin(parents, frontier) & ~found
+            found |= children
+            frontier = table[children]
+        return table[found]
+
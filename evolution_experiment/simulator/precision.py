@@ -0,0 +1,59 @@
+"""
+Engine-wide floating-point precision.
+
+float64 is the default and reproduces the reference results. float32 is an
+opt-in mode that halves the size of positions, distances and the dense
+per-step matrices in behaviours.py. Energies are rounded to float32 after every
+update, so stored state behaves as single precision. Scalar arithmetic inside
+Creature methods still runs on Python floats.
+
+Set the precision before creating creatures and leave it alone for the whole
+run. Arrays created under one precision keep their dtype.
+"""
+
+import numpy as np
+
+_SUPPORTED = {"float64": np.float64, "float32": np.float32}
+
+dtype = np.float64
+
+
+def _round64(x):
+    return float(x)
+
+
+def _round32(x):
+    return float(np.float32(x))
+
+
+round_scalar = _round64
+
+
+def set_float_dtype(new_dtype):
+    """Select the engine precision ("float64" or "float32", or the NumPy type)."""
+    global dtype, round_scalar
+    name = np.dtype(new_dtype).name
+    if name not in _SUPPORTED:
+        raise ValueError(f"Unsupported engine dtype: {new_dtype!r}")
+    dtype = _SUPPORTED[name]
+    round_scalar = _round32 if dtype is np.float32 else _round64
+
+
+def get_float_dtype():
+    return dtype
+
+
+class float_precision:
+    """Context manager that sets the engine precision and restores it on exit."""
+
+    def __init__(self, new_dtype):
+        self._new = new_dtype
+        self._old = None
+
+    def __enter__(self):
+        self._old = dtype
+        set_float_dtype(self._new)
+        return self
+
+    def __exit__(self, *exc):
+        set_float_dtype(self._old)
@@ -0,0 +1,82 @@
+"""Shared-filesystem work queue: claims, lease recovery and local workers."""
+
+import os
+import pickle
+import threading
+
+from experiment import distributed
+
+# Small enough that a whole queue drains in seconds.
+SMALL = {"TRAIN_GENERATIONS": 2, "TRANSFER_GENERATIONS": 2, "N_CREATURES": 10}
+
+
+def _pending(queue):
+    return sorted(os.listdir(os.path.join(queue, "pending")))
+
+
+def test_only_one_claim_wins(tmp_path):
+    queue = str(tmp_path)
+    (tid,) = distributed.publish_tasks(queue, [0], ("rnd",))
+    info = distributed._try_claim(queue, tid, "a", 60.0)
+    assert info["worker"] == "a" and info["attempts"] == 1
+    assert distributed._try_claim(queue, tid, "b", 60.0) is None
+    assert os.listdir(os.path.join(queue, "leases")) == [tid]
+
+
+def test_fresh_claim_of_old_marker_is_not_expired(tmp_path):
+    queue = str(tmp_path)
+    (tid,) = distributed.publish_tasks(queue, [0], ("rnd",))
+    os.utime(os.path.join(queue, "pending", tid), (0, 0))
+    assert distributed._try_claim(queue, tid, "a", 60.0) is not None
+    assert distributed.reclaim_expired(queue, 60.0) == []
+
+
+def test_late_result_after_reclaim_does_not_stall_workers(tmp_path):
+    queue = str(tmp_path)
+    (tid,) = distributed.publish_tasks(queue, [0], ("rnd",))
+    task = distributed._load_task(queue, tid)
+    distributed._try_claim(queue, tid, "slow", 1.0)
+    os.utime(os.path.join(queue, "leases", tid), (0, 0))
+    assert distributed.reclaim_expired(queue, 1.0) == [tid]
+    # The slow worker finishes after all.
+    distributed._atomic_write_bytes(
+        os.path.join(queue, "results", f"{tid}.pkl"), pickle.dumps({"task": task}))
+
+    done = []
+    worker = threading.Thread(
+        target=lambda: done.append(distributed.work(queue, "w", 1.0, poll_seconds=0.05)),
+        daemon=True)
+    worker.start()
+    worker.join(timeout=10.0)
+    assert not worker.is_alive()
+    assert done == [0]
+    assert _pending(queue) == []
+
+
+def test_local_workers_match_a_single_process_run(tmp_path):
+    queue = str(tmp_path / "queue")
+    distributed.publish_tasks(queue, range(2), config=SMALL)
+    codes = distributed.run_local_workers(queue, 3, poll_seconds=0.05)
+    assert codes == [0, 0, 0]
+    assert _pending(queue) == []
+    assert os.listdir(os.path.join(queue, "leases")) == []
+
+    merged = distributed.merge_results(queue)
+    for cond in distributed.CONDITIONS:
+        assert [r["task"]["seed"] for r in merged[cond]] == [0, 1]
+    evo0 = merged["evo"][0]
+    again = distributed.run_task(evo0["task"])
+    assert again["train_metrics"] == evo0["train_metrics"]
+    assert again["transfer_metrics"] == evo0["transfer_metrics"]
+    assert merged["opt"][0]["evo_budget"] == evo0["total_steps"]
+
+
+def test_failing_task_moves_to_failed_with_its_dependents(tmp_path):
+    queue = str(tmp_path)
+    distributed.publish_tasks(queue, [0], ("evo", "opt"),
+                              config=dict(SMALL, TRAIN_FOOD="not a number"))
+    assert distributed.work(queue, "w", poll_seconds=0.05, max_attempts=2) == 0
+    assert sorted(os.listdir(os.path.join(queue, "failed"))) == [
+        distributed.task_id("evo", 0), distributed.task_id("opt", 0)]
+    status = distributed.queue_status(queue)
+    assert status["failed"] == 2 and status["pending"] == 0
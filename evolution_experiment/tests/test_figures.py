@@ -0,0 +1,38 @@
+"""Analysis and figures on metrics produced by a real (small) simulate run."""
+
+import os
+
+import pytest
+
+from experiment import cli, conditions
+from experiment.analysis import load_raw, run_analysis
+from experiment.figures import FIGURES, TIMELINE_METRICS, make_figures
+
+
+@pytest.fixture(scope="module")
+def results_dir(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("results"))
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(conditions, "TRAIN_GENERATIONS", 2)
+        mp.setattr(conditions, "TRANSFER_GENERATIONS", 2)
+        mp.setattr(conditions, "N_CREATURES", 10)
+        cli.main(["--results-dir", path, "simulate", "--seeds", "2"])
+    return path
+
+
+def test_raw_metrics_have_the_plotted_columns(results_dir):
+    raw = load_raw(results_dir)
+    missing = [m for m in TIMELINE_METRICS if m not in raw.columns]
+    assert missing == []
+    assert set(raw["condition"]) == {"evo", "opt", "rnd"}
+
+
+def test_analysis_and_figures_render(results_dir):
+    for path in run_analysis(results_dir):
+        assert os.path.getsize(path) > 0
+    written, skipped = make_figures(results_dir, workers=1)
+    assert skipped == []
+    for name in FIGURES:
+        for ext in ("png", "pdf"):
+            assert os.path.getsize(os.path.join(results_dir, f"{name}.{ext}")) > 0
+    assert make_figures(results_dir, workers=1) == ([], list(FIGURES))
@@ -0,0 +1,52 @@
+"""Recorders sharing the Generation / Simulation.run hook."""
+
+import pytest
+
+from experiment import conditions
+from simulator import hooks
+from simulator.events import EventRecorder
+from simulator.generation import Generation
+from simulator.instrumentation import MemoryInstrumentation
+from simulator.lineage import Lineage, LineageRecorder
+from simulator.simulation import Simulation
+
+
+@pytest.fixture
+def small(monkeypatch):
+    monkeypatch.setattr(conditions, "TRAIN_GENERATIONS", 2)
+    monkeypatch.setattr(conditions, "TRANSFER_GENERATIONS", 2)
+    monkeypatch.setattr(conditions, "N_CREATURES", 10)
+
+
+def _record(tmp_path, order):
+    lineage_path = str(tmp_path / f"{''.join(order)}.lin")
+    recorders = {"events": EventRecorder(), "mem": MemoryInstrumentation(),
+                 "lineage": LineageRecorder(lineage_path, seed=0)}
+    stack = [recorders[name] for name in order]
+    for rec in stack:
+        rec.__enter__()
+    try:
+        conditions.run_opt(0, 10_000)
+    finally:
+        for rec in reversed(stack):
+            rec.__exit__(None, None, None)
+    return recorders, Lineage.open(lineage_path)
+
+
+def test_recorders_do_not_depend_on_install_order(small, tmp_path):
+    init, run = Generation.__dict__["__init__"], Simulation.__dict__["run"]
+    first, lineage_a = _record(tmp_path, ("events", "mem", "lineage"))
+    second, lineage_b = _record(tmp_path, ("lineage", "mem", "events"))
+    assert Generation.__dict__["__init__"] is init
+    assert Simulation.__dict__["run"] is run
+    assert hooks._observers == []
+
+    keys = [(p, g) for p, g, _ in first["events"].logs]
+    assert keys == [("train", 0), ("train", 1), ("transfer", 0), ("transfer", 1)]
+    assert [(p, g) for p, g, _ in second["events"].logs] == keys
+    for rec in (first["mem"], second["mem"]):
+        assert [(r["phase"], r["generation"]) for r in rec.rows] == keys
+    # OPT search evaluations are outside Simulation.run: lineage records them,
+    # events and memory rows do not.
+    assert len(lineage_a) == len(lineage_b) > 0
+    assert first["lineage"].generation == second["lineage"].generation > len(keys)